@@ -0,0 +1,92 @@
+import argparse
+import json
+
+from llama_cpp import Llama, LlamaGrammar
+
+from shared.grammar import GRAMMARS
+from shared.model_registry import MODELS
+from shared.settings import N_GPU_LAYERS, DATA_DIR, MISTRAL_7B_FILE
+from shared.timer_utils import AggregateSink, Span, set_sinks, span
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+    },
+    "required": ["title", "summary"],
+}
+
+PROMPT = (
+    "Summarize this transcript in a JSON output with keys 'title' and 'summary': "
+    "Today we talk about the fragmented nature of the supply chain, and how existing monopolies "
+    "make it hard for new companies to compete."
+)
+
+
+def benchmark_compilation(runs: int) -> None:
+    """Compiling a grammar from scratch every call, as response_format and the old load_grammar did, vs the registry."""
+    schema = json.dumps(SCHEMA)
+    for _ in range(runs):
+        with span("compile/llama.gbnf/uncached"):
+            LlamaGrammar.from_file(DATA_DIR / "llama.gbnf", verbose=False)
+        with span("compile/llama.gbnf/registry"):
+            GRAMMARS.from_file(DATA_DIR / "llama.gbnf")
+        with span("compile/json_schema/uncached"):
+            LlamaGrammar.from_json_schema(schema, verbose=False)
+        with span("compile/json_schema/registry"):
+            GRAMMARS.from_json_schema(SCHEMA)
+
+
+def benchmark_generation(llm: Llama, runs: int, max_tokens: int, results: AggregateSink) -> None:
+    """Generation without a grammar, with a cached grammar, and with one compiled per call (response_format)."""
+    messages = [{"role": "user", "content": PROMPT}]
+    variants = {
+        "generate/no_grammar": {},
+        "generate/registry_grammar": {"grammar": GRAMMARS.from_json_schema(SCHEMA)},
+        "generate/response_format": {"response_format": {"type": "json_object", "schema": SCHEMA}},
+    }
+    # one untimed call, so the prompt is in the KV cache for every timed run
+    llm.create_chat_completion(messages=messages, max_tokens=1)
+    for _ in range(runs):
+        for name, kwargs in variants.items():
+            with span(name) as current:
+                response = llm.create_chat_completion(
+                    messages=messages, max_tokens=max_tokens, temperature=0, **kwargs
+                )
+            # per-token time too, so runs that stop early (the grammar closes the JSON object) stay comparable
+            tokens = max(response["usage"]["completion_tokens"], 1)
+            results.emit(
+                Span(
+                    name=f"{name}/per_token",
+                    span_id=current.span_id,
+                    parent_id=None,
+                    depth=0,
+                    started_at=current.started_at,
+                    duration=current.duration / tokens,
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark grammar compilation and grammar-constrained generation.")
+    parser.add_argument("--model", "-m", default=MISTRAL_7B_FILE, help="GGUF model file in the data directory")
+    parser.add_argument("--runs", "-r", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--compile-only", action="store_true", help="Skip the generation benchmark (no model needed)")
+    args = parser.parse_args()
+
+    results = AggregateSink()
+    set_sinks(results)
+    benchmark_compilation(runs=max(args.runs, 20))
+    if not args.compile_only:
+        llm = MODELS.get(
+            DATA_DIR / args.model,
+            n_ctx=1024,
+            n_gpu_layers=N_GPU_LAYERS,
+            chat_format="mistral-instruct",
+            verbose=False,
+        )
+        benchmark_generation(llm, runs=args.runs, max_tokens=args.max_tokens, results=results)
+    print(results.report())
+    print(f"Grammar registry: {GRAMMARS.stats()}")
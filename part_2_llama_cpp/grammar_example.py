@@ -3,7 +3,10 @@ import pprint
 
 from llama_cpp import Llama
 
+from shared.grammar import GRAMMARS
 from shared.settings import N_GPU_LAYERS, DATA_DIR
+from shared.model_registry import MODELS
+from shared.llm_metrics import create_chat_completion, write_metrics
 from shared.timer_utils import timer
 
 PRINTER = pprint.PrettyPrinter(indent=4)
@@ -16,14 +19,18 @@ def run_llm(user_prompt: str, llm: Llama, json_format: bool = False):
     # inference much faster). If you only have access to CPU, then set it to 0.
     # chat_format is not a well documented (but important) parameter, you can find the source code here: https://github.com/abetlen/llama-cpp-python/blob/main/llama_cpp/llama_chat_format.py
     system_prompt = "You are a helpful assistant, reply to any queries in English. Do not make up information."
-    response = llm.create_chat_completion(
+    # streamed under the hood so time to first token and inter-token latency are recorded
+    response = create_chat_completion(
+        llm,
+        endpoint="grammar_example",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
         max_tokens=-1,  # use n_ctx
         temperature=0.1,
-        response_format={"type": "json_object"} if json_format else None,
+        # the same grammar as response_format={"type": "json_object"}, but compiled once rather than per call
+        grammar=GRAMMARS.json_object() if json_format else None,
     )
 
     return response
@@ -31,8 +38,8 @@ def run_llm(user_prompt: str, llm: Llama, json_format: bool = False):
 
 if __name__ == "__main__":
     # https://huggingface.co/mistralai/Mixtral-8x7B-Instruct-v0.1
-    mixtral_llm = Llama(
-        model_path=str(DATA_DIR / "mixtral_8x7b_instruct_v0.1.Q4_K_M.gguf"),
+    mixtral_llm = MODELS.get(
+        DATA_DIR / "mixtral_8x7b_instruct_v0.1.Q4_K_M.gguf",
         n_ctx=32000,
         n_gpu_layers=N_GPU_LAYERS,
         chat_format="llama-2",  # this is very close to the mixtral chat format
@@ -48,3 +55,6 @@ if __name__ == "__main__":
     result = run_llm(llm=mixtral_llm, user_prompt=prompt, json_format=True)
     with open(DATA_DIR / "summary_044.json", "w") as handler:
         json.dump(result, handler)
+
+    print(MODELS.report())
+    write_metrics(DATA_DIR / "metrics" / "grammar_example.prom")
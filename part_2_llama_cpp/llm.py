@@ -1,11 +1,15 @@
+import argparse
 import pprint
 import textwrap
+import time
 
 from llama_cpp import Llama
 
 from shared.grammar import load_grammar
 from shared.settings import N_GPU_LAYERS, DATA_DIR, MISTRAL_7B_FILE
-from shared.timer_utils import timer
+from shared.model_registry import MODELS
+from shared.llm_metrics import create_chat_completion, write_metrics
+from shared.timer_utils import AggregateSink, add_sink, timer
 
 PRINTER = pprint.PrettyPrinter(indent=4)
 
@@ -18,7 +22,10 @@ def run_llm(user_prompt: str, llm: Llama, json_format: bool = False):
     # chat_format is not a well documented (but important) parameter, you can find the source code here: https://github.com/abetlen/llama-cpp-python/blob/main/llama_cpp/llama_chat_format.py
     system_prompt = "You are a helpful assistant, reply to any queries in English. Do not make up information."
 
-    response = llm.create_chat_completion(
+    # streamed under the hood so time to first token and inter-token latency are recorded
+    response = create_chat_completion(
+        llm,
+        endpoint="llm",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
@@ -31,32 +38,64 @@ def run_llm(user_prompt: str, llm: Llama, json_format: bool = False):
     return response
 
 
-if __name__ == "__main__":
-    tiny_llm = Llama(
-        model_path=str(DATA_DIR / "tiny_llama_v0.3.gguf"),
-        n_ctx=512,
-        n_gpu_layers=N_GPU_LAYERS,
-        chat_format="chatml",
-    )
+def tiny_llm() -> Llama:
+    # loaded (memory-mapped) on first use, then shared by the registry
+    return MODELS.get(DATA_DIR / "tiny_llama_v0.3.gguf", n_ctx=512, n_gpu_layers=N_GPU_LAYERS, chat_format="chatml")
+
+
+def mistral_llm() -> Llama:
     # https://huggingface.co/TheBloke/Mistral-7B-Instruct-v0.2-GGUF
-    mistral_llm = Llama(
-        model_path=str(DATA_DIR / MISTRAL_7B_FILE),
-        n_ctx=512,
-        n_gpu_layers=N_GPU_LAYERS,
-        chat_format="mistral-instruct",
+    return MODELS.get(
+        DATA_DIR / MISTRAL_7B_FILE, n_ctx=512, n_gpu_layers=N_GPU_LAYERS, chat_format="mistral-instruct"
     )
 
+
+def tokens_per_second(response, seconds: float) -> float:
+    return response["usage"]["completion_tokens"] / seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare TinyLlama and Mistral on a few prompts.")
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Also run Mistral with TinyLlama drafting tokens (speculative decoding), and compare speeds",
+    )
+    parser.add_argument("--draft-tokens", type=int, default=8, help="Tokens TinyLlama drafts per Mistral forward pass")
+    args = parser.parse_args()
+
     # You'd do something more comprehensive like this: http://ciar.org/h/notes.test-prompts.json
     USER_PROMPTS = [
         "Hello, how are you?",
         "What is the capital of Spain?",
         "On a scale of 1-10 how good is Blade Runner 2049?",
     ]
+    latencies = AggregateSink()
+    add_sink(latencies)
     results = []
+    speeds = {"mistral": [], "mistral + tiny draft": []}
+    draft = None
+    if args.speculative:
+        # imported here so the plain comparison works on llama-cpp-python builds without speculative decoding
+        try:
+            from shared.speculative import SmallModelDraft, speculative_decoding
+        except ImportError as e:
+            parser.error(f"--speculative needs llama-cpp-python with llama_cpp.llama_speculative (0.2.38+): {e}")
+        draft = SmallModelDraft(tiny_llm(), mistral_llm(), num_draft_tokens=args.draft_tokens)
     for index, prompt in enumerate(USER_PROMPTS):
-        tiny_result = run_llm(user_prompt=prompt, llm=tiny_llm)
-        mistral_result = run_llm(user_prompt=prompt, llm=mistral_llm)
+        tiny_result = run_llm(user_prompt=prompt, llm=tiny_llm())
+        start = time.perf_counter()
+        mistral_result = run_llm(user_prompt=prompt, llm=mistral_llm())
+        speeds["mistral"].append(tokens_per_second(mistral_result, time.perf_counter() - start))
         results.append((prompt, tiny_result, mistral_result))
+        if draft is not None:
+            # the draft only changes how fast Mistral generates, not what it is likely to say
+            with speculative_decoding(mistral_llm(), draft):
+                start = time.perf_counter()
+                speculative_result = run_llm(user_prompt=prompt, llm=mistral_llm())
+                speeds["mistral + tiny draft"].append(
+                    tokens_per_second(speculative_result, time.perf_counter() - start)
+                )
 
     # Now, print the results wrapping the lines with textwrap
     wrapper = textwrap.TextWrapper(width=80)
@@ -70,3 +109,16 @@ if __name__ == "__main__":
             f'Mistral response: {wrapper.fill(result[2]["choices"][0]["message"]["content"].strip())}'
         )
         print("-----------------------------------\n")
+
+    print(latencies.report())
+    for name, values in speeds.items():
+        if values:
+            print(f"{name}: {sum(values) / len(values):.1f} tokens/sec")
+    if draft is not None:
+        stats = draft.stats()
+        print(
+            f"Draft acceptance: {stats['accepted']}/{stats['drafted']} tokens ({stats['acceptance_rate']:.0%}) "
+            f"over {stats['calls']} drafts, same vocabulary: {draft.shared_vocabulary}"
+        )
+    print(MODELS.report())
+    write_metrics(DATA_DIR / "metrics" / "llm.prom")
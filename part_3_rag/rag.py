@@ -19,6 +19,7 @@ from llama_index.embeddings import HuggingFaceEmbedding
 from llama_index.llms import LlamaCPP
 from transformers import AutoTokenizer
 
+from shared.embedding_cache import CachedEmbedding, EmbeddingCache
 from shared.settings import DATA_DIR
 
 SYSTEM_PROMPT_TEXT = "You are bot that answers questions about podcast transcripts."
@@ -39,8 +40,13 @@ def load_llm(model_path: Path) -> LlamaCPP:
     )
 
 
-def load_embedding_model() -> HuggingFaceEmbedding:
-    return HuggingFaceEmbedding(model_name="WhereIsAI/UAE-Large-V1")
+def load_embedding_model() -> CachedEmbedding:
+    # Chunks that were embedded before (by any index build) are read back from disk
+    # instead of being run through the model again.
+    return CachedEmbedding(
+        embed_model=HuggingFaceEmbedding(model_name="WhereIsAI/UAE-Large-V1"),
+        cache=EmbeddingCache(DATA_DIR / "embedding_cache.sqlite3"),
+    )
 
 
 def save_or_load_index(
@@ -75,7 +81,7 @@ def run_inference(
     use_rag: bool,
     messages: list[ChatMessage],
     llm: LlamaCPP,
-    embedding_model: HuggingFaceEmbedding | None = None,
+    embedding_model: CachedEmbedding | None = None,
 ) -> ChatResponse | Response:
     if not use_rag:
         return llm.chat(messages=messages)
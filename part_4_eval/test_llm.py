@@ -10,6 +10,7 @@ from deepeval.test_case import LLMTestCase, LLMTestCaseParams
 from llama_cpp import Llama, LlamaGrammar
 
 from shared.grammar import load_grammar
+from shared.model_registry import MODELS
 from shared.settings import DATA_DIR, N_GPU_LAYERS, MISTRAL_7B_FILE
 
 
@@ -75,8 +76,9 @@ def short_transcript(test_data_dir: Path) -> str:
 
 @pytest.fixture(scope="module")
 def llm() -> Llama:
-    return Llama(
-        model_path=str(DATA_DIR / MISTRAL_7B_FILE),
+    # shared with any other test module asking for the same model and parameters
+    return MODELS.get(
+        DATA_DIR / MISTRAL_7B_FILE,
         n_ctx=32000,
         n_batch=N_GPU_LAYERS,
         chat_format="mistral-instruct",
@@ -0,0 +1,309 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+EmbedFunction = Callable[[str], Awaitable[List[float]]]
+
+
+class CacheEntry(NamedTuple):
+    """
+    A cached completion.
+
+    Attributes:
+        response (str): The cleaned completion text returned to the client.
+        total_tokens (int): The prompt and completion tokens the upstream call was billed for.
+        expires_at (float): The monotonic time after which the entry is stale.
+    """
+
+    response: str
+    total_tokens: int
+    expires_at: float
+
+
+class CacheLookup(NamedTuple):
+    """
+    The outcome of a cache lookup, carrying what is needed to store the response on a miss.
+
+    Attributes:
+        entry (CacheEntry | None): The cached completion, or None on a miss.
+        tier (str | None): The tier that answered ("exact" or "semantic"), or None on a miss.
+        key (str): The exact-match key of the request.
+        partition (str): The semantic partition of the request; only requests in the same partition can match.
+        text (str): The text compared by the semantic tier (the last user message).
+        embedding (np.ndarray | None): The normalised embedding of `text`, if the semantic tier computed one.
+    """
+
+    entry: Optional[CacheEntry]
+    tier: Optional[str]
+    key: str
+    partition: str
+    text: str
+    embedding: Optional[np.ndarray]
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def request_keys(model: str, messages: Messages, max_tokens: int, temperature: float) -> Tuple[str, str]:
+    """
+    Computes the exact-match key and the semantic partition of a chat completion request.
+
+    Args:
+        model (str): The model identifier.
+        messages (Messages): The chat messages.
+        max_tokens (int): The maximum number of tokens to generate.
+        temperature (float): The sampling temperature.
+
+    Returns:
+        Tuple[str, str]: The exact key (a hash of every parameter) and the partition (a hash of every parameter but
+            the last message, whose text is compared semantically).
+    """
+    exact_key = _digest([model, messages, max_tokens, temperature])
+    partition = _digest([model, messages[:-1], max_tokens, temperature])
+    return exact_key, partition
+
+
+class ExactResponseCache:
+    """
+    An in-memory LRU cache of completions keyed by a hash of the full request, with a time-to-live.
+
+    Attributes:
+        max_entries (int): The number of completions kept before the least recently used one is evicted.
+        ttl_seconds (float): How long a completion may be served from the cache.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Returns the fresh entry stored under a key, if any.
+
+        Args:
+            key (str): The exact-match key.
+
+        Returns:
+            CacheEntry | None: The entry, or None if it is missing or has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, response: str, total_tokens: int) -> CacheEntry:
+        """
+        Stores a completion, evicting the least recently used entries beyond `max_entries`.
+
+        Args:
+            key (str): The exact-match key.
+            response (str): The completion text.
+            total_tokens (int): The tokens the upstream call was billed for.
+
+        Returns:
+            CacheEntry: The stored entry.
+        """
+        entry = CacheEntry(response, total_tokens, time.monotonic() + self.ttl_seconds)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticResponseCache:
+    """
+    An in-memory cache that answers a request with the completion of a previous, similarly worded one.
+
+    Requests only match within the same partition (same model, parameters and preceding messages), when the cosine
+    similarity of their last messages' embeddings reaches `threshold`. Entries share the LRU and TTL policy of the
+    exact tier. Lookups compare against every live entry of the partition, which is cheap for the few thousand
+    entries this cache is meant to hold.
+
+    Attributes:
+        embed (EmbedFunction): Asynchronously embeds a text.
+        threshold (float): The minimum cosine similarity for a match.
+        max_entries (int): The number of completions kept before the least recently used one is evicted.
+        ttl_seconds (float): How long a completion may be served from the cache.
+    """
+
+    def __init__(self, embed: EmbedFunction, threshold: float, max_entries: int, ttl_seconds: float) -> None:
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, Tuple[str, np.ndarray, CacheEntry]] = OrderedDict()
+        self._next_id = 0
+
+    async def embed_normalised(self, text: str) -> np.ndarray:
+        """
+        Embeds a text and scales the embedding to unit length, so dot products are cosine similarities.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            np.ndarray: The normalised float32 embedding.
+        """
+        embedding = np.asarray(await self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def get(self, partition: str, embedding: np.ndarray) -> Optional[CacheEntry]:
+        """
+        Returns the fresh entry of the partition most similar to the embedding, if it is similar enough.
+
+        Args:
+            partition (str): The semantic partition of the request.
+            embedding (np.ndarray): The normalised embedding of the request's last message.
+
+        Returns:
+            CacheEntry | None: The best match, or None if no entry reaches the threshold.
+        """
+        now = time.monotonic()
+        for entry_id in [entry_id for entry_id, (_, _, entry) in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[entry_id]
+
+        candidates = [
+            (entry_id, stored_embedding)
+            for entry_id, (stored_partition, stored_embedding, _) in self._entries.items()
+            if stored_partition == partition
+        ]
+        if not candidates:
+            return None
+        similarities = np.stack([stored_embedding for _, stored_embedding in candidates]) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        entry_id = candidates[best][0]
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][2]
+
+    def set(self, partition: str, embedding: np.ndarray, entry: CacheEntry) -> None:
+        """
+        Stores a completion under its partition and embedding.
+
+        Args:
+            partition (str): The semantic partition of the request.
+            embedding (np.ndarray): The normalised embedding of the request's last message.
+            entry (CacheEntry): The completion to store.
+        """
+        self._entries[self._next_id] = (partition, embedding, entry)
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    A two-tier completion cache: an exact-match tier, optionally backed by a semantic tier.
+
+    The exact tier is consulted first. On an exact miss the semantic tier, if configured, embeds the last message and
+    looks for a similar earlier request. Hits and misses are counted per tier, along with the upstream tokens the hits
+    avoided, so the savings can be read from `stats`.
+
+    Attributes:
+        exact (ExactResponseCache): The exact-match tier.
+        semantic (SemanticResponseCache | None): The optional semantic tier.
+    """
+
+    def __init__(self, exact: ExactResponseCache, semantic: Optional[SemanticResponseCache] = None) -> None:
+        self.exact = exact
+        self.semantic = semantic
+        self._counters: Dict[str, int] = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "tokens_saved": 0,
+            "semantic_errors": 0,
+        }
+
+    async def lookup(self, model: str, messages: Messages, max_tokens: int, temperature: float) -> CacheLookup:
+        """
+        Looks a chat completion request up in the exact tier, then in the semantic tier.
+
+        Args:
+            model (str): The model identifier.
+            messages (Messages): The chat messages.
+            max_tokens (int): The maximum number of tokens to generate.
+            temperature (float): The sampling temperature.
+
+        Returns:
+            CacheLookup: The lookup outcome; pass it to `store` after a miss.
+        """
+        key, partition = request_keys(model, messages, max_tokens, temperature)
+        text = messages[-1]["content"]
+
+        entry = self.exact.get(key)
+        if entry is not None:
+            return self._hit(CacheLookup(entry, "exact", key, partition, text, None))
+
+        embedding = None
+        if self.semantic is not None:
+            try:
+                embedding = await self.semantic.embed_normalised(text)
+            except Exception:
+                # the semantic tier is an optimisation, an embedding failure must not fail the request
+                logger.exception("Semantic cache embedding failed")
+                self._counters["semantic_errors"] += 1
+            if embedding is not None:
+                entry = self.semantic.get(partition, embedding)
+                if entry is not None:
+                    return self._hit(CacheLookup(entry, "semantic", key, partition, text, embedding))
+
+        self._counters["misses"] += 1
+        return CacheLookup(None, None, key, partition, text, embedding)
+
+    def store(self, lookup: CacheLookup, response: str, total_tokens: int) -> None:
+        """
+        Stores the completion of a request that missed the cache in every configured tier.
+
+        Args:
+            lookup (CacheLookup): The miss returned by `lookup`.
+            response (str): The completion text.
+            total_tokens (int): The tokens the upstream call was billed for.
+        """
+        entry = self.exact.set(lookup.key, response, total_tokens)
+        if self.semantic is not None and lookup.embedding is not None:
+            self.semantic.set(lookup.partition, lookup.embedding, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the hit and miss counters, the hit rate and the number of cached entries per tier.
+
+        Returns:
+            Dict[str, Any]: The cache statistics.
+        """
+        lookups = self._counters["exact_hits"] + self._counters["semantic_hits"] + self._counters["misses"]
+        hits = lookups - self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "exact_entries": len(self.exact),
+            "semantic_entries": len(self.semantic) if self.semantic is not None else 0,
+        }
+
+    def _hit(self, lookup: CacheLookup) -> CacheLookup:
+        self._counters[f"{lookup.tier}_hits"] += 1
+        self._counters["tokens_saved"] += lookup.entry.total_tokens
+        return lookup
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Generic, List, Optional, Protocol, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+T_co = TypeVar("T_co", covariant=True)
+
+
+class UpstreamStream(Protocol[T_co]):
+    """
+    An upstream stream of chunks that can be closed early, like openai's AsyncStream.
+    """
+
+    def __aiter__(self) -> AsyncIterator[T_co]: ...
+
+    async def close(self) -> None: ...
+
+
+class SingleFlight(Generic[T]):
+    """
+    Deduplicates concurrent identical calls: while a call for a key is in flight, later callers with the same key
+    wait for its result instead of starting their own.
+
+    The shared call runs in its own task, so a caller that disconnects does not cancel it for everyone else.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Returns the result of `call`, sharing it with every concurrent caller that uses the same key.
+
+        Args:
+            key (str): Identifies identical calls.
+            call (Callable[[], Awaitable[T]]): Makes the call; only invoked if no call for the key is in flight.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.create_task(call())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+class _SharedStream(Generic[T]):
+    """
+    The chunks produced so far by one upstream stream, and the subscribers following it.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[T] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.opened: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.producer: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk: T) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+    def _notify(self) -> None:
+        # wake every waiting subscriber, and give the next round of waiters a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class Subscription(Generic[T]):
+    """
+    One subscriber's view of a shared stream: every chunk, from the first one.
+
+    It holds its place among the stream's subscribers from `StreamCoalescer.subscribe` until it is exhausted,
+    closed or garbage collected, whichever comes first, so a subscription that is never read cannot keep the
+    upstream stream alive, and one not read yet cannot have it cancelled by the others leaving.
+    """
+
+    def __init__(self, coalescer: "StreamCoalescer[T]", shared: _SharedStream[T]) -> None:
+        self._coalescer = coalescer
+        self._shared = shared
+        self._chunks = coalescer._follow(shared)
+        self._released = False
+
+    def __aiter__(self) -> "Subscription[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        try:
+            return await self._chunks.__anext__()
+        except BaseException:
+            # the stream ended or failed, or the reader was cancelled: either way this subscriber is done
+            self._release()
+            raise
+
+    async def aclose(self) -> None:
+        """
+        Leaves the stream; the upstream stream is closed if no other subscriber is left.
+        """
+        self._release()
+        await self._chunks.aclose()
+
+    def __del__(self) -> None:
+        self._release()
+
+    def _release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._coalescer._unsubscribe(self._shared)
+
+
+class StreamCoalescer(Generic[T]):
+    """
+    Shares one upstream stream between every concurrent identical streaming request.
+
+    The first request for a key opens the upstream stream in a producer task that buffers every chunk. Requests that
+    join while it is running first replay the buffered chunks, then follow the live stream. When the last subscriber
+    leaves before the stream ends, the producer is cancelled and the upstream stream is closed, so nobody pays for
+    tokens nobody reads.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _SharedStream[T]] = {}
+        self.coalesced = 0
+
+    async def subscribe(
+        self, key: str, open_stream: Callable[[], Awaitable[UpstreamStream[T]]]
+    ) -> Subscription[T]:
+        """
+        Subscribes to the upstream stream for a key, opening it if no identical stream is in flight.
+
+        Waits until the upstream stream is open, so errors opening it are raised here rather than mid-response.
+
+        Args:
+            key (str): Identifies identical requests.
+            open_stream (Callable[[], Awaitable[UpstreamStream[T]]]): Opens the upstream stream; only invoked if no
+                stream for the key is in flight.
+
+        Returns:
+            Subscription[T]: Every chunk of the stream, from the first one; close it to leave the stream early.
+        """
+        shared = self._flights.get(key)
+        if shared is None:
+            shared = _SharedStream()
+            self._flights[key] = shared
+            shared.producer = asyncio.create_task(self._produce(key, shared, open_stream))
+        else:
+            self.coalesced += 1
+        shared.subscribers += 1
+        try:
+            await asyncio.shield(shared.opened)
+        except BaseException:
+            self._unsubscribe(shared)
+            raise
+        # from here on the subscription releases the count, exactly once
+        return Subscription(self, shared)
+
+    async def _produce(
+        self, key: str, shared: _SharedStream[T], open_stream: Callable[[], Awaitable[UpstreamStream[T]]]
+    ) -> None:
+        stream = None
+        error = None
+        try:
+            stream = await open_stream()
+            shared.opened.set_result(None)
+            async for chunk in stream:
+                shared.publish(chunk)
+        except asyncio.CancelledError:
+            error = asyncio.CancelledError()
+        except Exception as e:
+            logger.exception("Upstream stream failed")
+            error = e
+        finally:
+            if not shared.opened.done():
+                if isinstance(error, asyncio.CancelledError):
+                    shared.opened.cancel()
+                else:
+                    shared.opened.set_exception(error)
+            # new requests for this key start a fresh stream from here on
+            if self._flights.get(key) is shared:
+                del self._flights[key]
+            shared.finish(error)
+            if stream is not None:
+                await stream.close()
+
+    async def _follow(self, shared: _SharedStream[T]) -> AsyncGenerator[T, None]:
+        position = 0
+        while True:
+            while position < len(shared.chunks):
+                yield shared.chunks[position]
+                position += 1
+            if shared.done:
+                if shared.error is not None:
+                    raise shared.error
+                return
+            await shared.wait()
+
+    def _unsubscribe(self, shared: _SharedStream[T]) -> None:
+        shared.subscribers -= 1
+        if shared.subscribers == 0 and not shared.done and shared.producer is not None:
+            shared.producer.cancel()
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -14,6 +14,7 @@ class LLMSettings(BaseSettings):
         MODEL (str): Identifier for the model used in chat completions.
         CHAT_FORMAT (str): The format used for chat interactions.
         TOGETHER_API_KEY (str): The API key for accessing the Together platform, picked up from environment variables.
+        COALESCE_IDENTICAL_REQUESTS (bool): Whether concurrent identical requests share one upstream completion.
     """
 
     CONTEXT_WINDOW: int = 16000
@@ -22,6 +23,64 @@ class LLMSettings(BaseSettings):
     MODEL: str = "mistralai/Mixtral-8x7B-Instruct-v0.1"
     BASE_URL: str = "https://api.together.xyz"
     TOGETHER_API_KEY: str  # Will be picked up from environment variables
+    COALESCE_IDENTICAL_REQUESTS: bool = True
+
+
+class HTTPClientSettings(BaseSettings):
+    """
+    Configuration settings for the connection pool shared by every request to the LLM API.
+
+    Attributes:
+        MAX_CONNECTIONS (int): The maximum number of concurrent connections to the API.
+        MAX_KEEPALIVE_CONNECTIONS (int): The number of idle connections kept open for reuse.
+        KEEPALIVE_EXPIRY (float): Seconds an idle connection is kept open before it is closed.
+        CONNECT_TIMEOUT (float): Seconds allowed for establishing a connection (including the TLS handshake).
+        TIMEOUT (float): Seconds allowed for reading, writing and waiting for a pooled connection.
+        HTTP2 (bool): Whether to negotiate HTTP/2 with the API when the `h2` package is installed.
+    """
+
+    MAX_CONNECTIONS: int = 100
+    MAX_KEEPALIVE_CONNECTIONS: int = 20
+    KEEPALIVE_EXPIRY: float = 30.0
+    CONNECT_TIMEOUT: float = 5.0
+    TIMEOUT: float = 600.0
+    HTTP2: bool = True
+
+
+class CacheSettings(BaseSettings):
+    """
+    Configuration settings for the /inference/batch/ response cache.
+
+    Attributes:
+        ENABLED (bool): Whether batch completions are cached at all.
+        MAX_ENTRIES (int): The number of completions kept per tier before the least recently used is evicted.
+        TTL_SECONDS (float): How long a completion may be served from the cache.
+        SEMANTIC_ENABLED (bool): Whether requests may be answered with the completion of a similarly worded request.
+        SEMANTIC_THRESHOLD (float): The minimum cosine similarity between two user messages for a semantic hit.
+        EMBEDDING_MODEL (str): The embedding model the semantic tier uses, served by the same API as the LLM.
+    """
+
+    ENABLED: bool = True
+    MAX_ENTRIES: int = 1024
+    TTL_SECONDS: float = 3600
+    SEMANTIC_ENABLED: bool = False
+    SEMANTIC_THRESHOLD: float = 0.95
+    EMBEDDING_MODEL: str = "togethercomputer/m2-bert-80M-8k-retrieval"
+
+
+class StreamingSettings(BaseSettings):
+    """
+    Configuration settings for the Server-Sent Events sent by /inference/stream/.
+
+    Attributes:
+        FLUSH_TOKENS (int): The number of buffered tokens that triggers sending an event.
+        FLUSH_INTERVAL_MS (float): The longest a token is buffered before it is sent, in milliseconds.
+        QUEUE_SIZE (int): The number of tokens read from the upstream stream ahead of the client.
+    """
+
+    FLUSH_TOKENS: int = 4
+    FLUSH_INTERVAL_MS: float = 50
+    QUEUE_SIZE: int = 256
 
 
 class Settings(BaseSettings):
@@ -30,9 +89,15 @@ class Settings(BaseSettings):
 
     Attributes:
         llm (LLMSettings): Settings related to the Large Language Model.
+        http_client (HTTPClientSettings): Settings for the pooled HTTP client used to call the LLM API.
+        cache (CacheSettings): Settings for the response cache.
+        streaming (StreamingSettings): Settings for streamed responses.
     """
 
     llm: LLMSettings = LLMSettings()
+    http_client: HTTPClientSettings = HTTPClientSettings()
+    cache: CacheSettings = CacheSettings()
+    streaming: StreamingSettings = StreamingSettings()
 
     class Config:
         """
@@ -1,21 +1,117 @@
-from typing import AsyncGenerator
+import importlib.util
+from typing import List
+
+import httpx
+from fastapi import Request
 from openai import AsyncOpenAI
+from app.cache import ExactResponseCache, ResponseCache, SemanticResponseCache
+from app.coalescing import SingleFlight, StreamCoalescer
 from app.config import settings
 
 
-async def get_llm_client() -> AsyncGenerator[AsyncOpenAI, None]:
+def create_llm_client() -> AsyncOpenAI:
     """
-    Asynchronously generates and provides an AsyncOpenAI client configured with API key and base URL from settings.
+    Creates the AsyncOpenAI client shared by every request, backed by a tuned httpx connection pool.
 
-    This asynchronous generator function initializes an AsyncOpenAI client using configuration details specified in the
-    application settings, particularly leveraging the Large Language Model (LLM) settings for the API key and the base URL.
-    It then yields this client for use in asynchronous operations involving the OpenAI API.
+    The client is created once in the application lifespan rather than per request, so connections (and their TCP
+    and TLS handshakes) are kept alive and reused across requests. HTTP/2 is negotiated when the `h2` package is
+    installed, letting concurrent requests share a single connection.
 
-    Yields:
-        AsyncOpenAI: An instance of AsyncOpenAI client configured for interacting with the OpenAI API asynchronously.
+    Returns:
+        AsyncOpenAI: An AsyncOpenAI client configured with the API key, base URL and connection pool from settings.
     """
-    client = AsyncOpenAI(
+    http_settings = settings.http_client
+    http_client = httpx.AsyncClient(
+        http2=http_settings.HTTP2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=http_settings.MAX_CONNECTIONS,
+            max_keepalive_connections=http_settings.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=http_settings.KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(http_settings.TIMEOUT, connect=http_settings.CONNECT_TIMEOUT),
+    )
+    return AsyncOpenAI(
         api_key=settings.llm.TOGETHER_API_KEY,
         base_url=settings.llm.BASE_URL,
+        http_client=http_client,
     )
-    yield client
+
+
+async def get_llm_client(request: Request) -> AsyncOpenAI:
+    """
+    Provides the shared AsyncOpenAI client created in the application lifespan.
+
+    Args:
+        request (Request): The incoming request, used to reach the application state.
+
+    Returns:
+        AsyncOpenAI: The application's pooled AsyncOpenAI client.
+    """
+    return request.app.state.llm_client
+
+
+def create_response_cache(llm_client: AsyncOpenAI) -> ResponseCache:
+    """
+    Creates the response cache for /inference/batch/, with a semantic tier if enabled in settings.
+
+    Args:
+        llm_client (AsyncOpenAI): The shared client, used by the semantic tier to embed user messages.
+
+    Returns:
+        ResponseCache: The configured response cache.
+    """
+    cache_settings = settings.cache
+    semantic = None
+    if cache_settings.SEMANTIC_ENABLED:
+
+        async def embed(text: str) -> List[float]:
+            response = await llm_client.embeddings.create(model=cache_settings.EMBEDDING_MODEL, input=text)
+            return response.data[0].embedding
+
+        semantic = SemanticResponseCache(
+            embed=embed,
+            threshold=cache_settings.SEMANTIC_THRESHOLD,
+            max_entries=cache_settings.MAX_ENTRIES,
+            ttl_seconds=cache_settings.TTL_SECONDS,
+        )
+    exact = ExactResponseCache(max_entries=cache_settings.MAX_ENTRIES, ttl_seconds=cache_settings.TTL_SECONDS)
+    return ResponseCache(exact=exact, semantic=semantic)
+
+
+async def get_response_cache(request: Request) -> ResponseCache | None:
+    """
+    Provides the application's response cache.
+
+    Args:
+        request (Request): The incoming request, used to reach the application state.
+
+    Returns:
+        ResponseCache | None: The response cache, or None if caching is disabled.
+    """
+    return request.app.state.response_cache
+
+
+async def get_batch_flights(request: Request) -> SingleFlight | None:
+    """
+    Provides the single-flight group that shares in-flight batch completions.
+
+    Args:
+        request (Request): The incoming request, used to reach the application state.
+
+    Returns:
+        SingleFlight | None: The single-flight group, or None if coalescing is disabled.
+    """
+    return request.app.state.batch_flights
+
+
+async def get_stream_flights(request: Request) -> StreamCoalescer | None:
+    """
+    Provides the coalescer that shares in-flight streaming completions.
+
+    Args:
+        request (Request): The incoming request, used to reach the application state.
+
+    Returns:
+        StreamCoalescer | None: The stream coalescer, or None if coalescing is disabled.
+    """
+    return request.app.state.stream_flights
@@ -1,20 +1,49 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, AsyncGenerator
 
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response
 from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
-from openai import AsyncOpenAI, AsyncStream
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionChunk
 from pydantic import BaseModel
 
 from app import deps  # Assuming this is correctly implemented elsewhere
+from app.cache import ResponseCache, request_keys
+from app.coalescing import SingleFlight, StreamCoalescer, Subscription
+from app.metrics import InstrumentedStream, LLMCallMetrics, metrics_response
+from app.streaming import SSE_HEADERS, sse_stream
 from app.config import settings
 
 # Project Directories
 BASE_PATH: Path = Path(__file__).resolve().parent
 TEMPLATES: Jinja2Templates = Jinja2Templates(directory=str(BASE_PATH / "templates"))
 
-app: FastAPI = FastAPI(title="Inference App")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """
+    Creates the shared LLM client on startup and closes its connection pool on shutdown.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    Yields:
+        None
+    """
+    app.state.llm_client = deps.create_llm_client()
+    app.state.response_cache = (
+        deps.create_response_cache(app.state.llm_client) if settings.cache.ENABLED else None
+    )
+    coalesce = settings.llm.COALESCE_IDENTICAL_REQUESTS
+    app.state.batch_flights = SingleFlight() if coalesce else None
+    app.state.stream_flights = StreamCoalescer() if coalesce else None
+    yield
+    await app.state.llm_client.close()
+
+
+app: FastAPI = FastAPI(title="Inference App", lifespan=lifespan)
 api_router: APIRouter = APIRouter()
 
 
@@ -60,13 +89,21 @@ class ChatInput(BaseModel):
 async def run_chat_inference(
     chat_input: ChatInput,
     llm_client: AsyncOpenAI | None = Depends(deps.get_llm_client),
+    response_cache: ResponseCache | None = Depends(deps.get_response_cache),
+    batch_flights: SingleFlight[str] | None = Depends(deps.get_batch_flights),
 ) -> Any:
     """
     Executes a batch inference using the provided chat input and returns the AI model's response.
 
+    Responses are served from the response cache when the same request (or, with the semantic tier enabled, a
+    similarly worded one) was answered recently, without calling the model. Identical requests that arrive while
+    a completion is in flight wait for it instead of making their own upstream call.
+
     Args:
         chat_input (ChatInput): The chat input containing the user's message and configuration for the inference.
         llm_client (AsyncOpenAI | None): The asynchronous OpenAI client, obtained via dependency injection.
+        response_cache (ResponseCache | None): The response cache, or None if caching is disabled.
+        batch_flights (SingleFlight[str] | None): Shares in-flight completions, or None if coalescing is disabled.
 
     Returns:
         Any: The cleaned and formatted response from the AI model.
@@ -74,67 +111,172 @@ async def run_chat_inference(
     Raises:
         HTTPException: If the chat completion is empty.
     """
-    chat_completion = await llm_client.chat.completions.create(
-        messages=[
-            {"role": "system", "content": "You are an AI assistant"},
-            {"role": "user", "content": f"{chat_input.user_message}"},
-        ],
-        model=settings.llm.MODEL,
-        max_tokens=chat_input.max_tokens,
-        temperature=settings.llm.TEMPERATURE,
-    )
+    messages = [
+        {"role": "system", "content": "You are an AI assistant"},
+        {"role": "user", "content": f"{chat_input.user_message}"},
+    ]
+    lookup = None
+    if response_cache is not None:
+        lookup = await response_cache.lookup(
+            model=settings.llm.MODEL,
+            messages=messages,
+            max_tokens=chat_input.max_tokens,
+            temperature=settings.llm.TEMPERATURE,
+        )
+        if lookup.entry is not None:
+            return lookup.entry.response
+
+    async def complete() -> str:
+        call_metrics = LLMCallMetrics(model=settings.llm.MODEL, endpoint="batch")
+        try:
+            chat_completion = await llm_client.chat.completions.create(
+                messages=messages,
+                model=settings.llm.MODEL,
+                max_tokens=chat_input.max_tokens,
+                temperature=settings.llm.TEMPERATURE,
+            )
+        except Exception:
+            call_metrics.finish(status="error")
+            raise
+        usage = chat_completion.usage if chat_completion else None
+        call_metrics.finish(
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+        if not chat_completion:
+            raise HTTPException(status_code=404, detail="Chat completion empty")
+
+        cleaned_response = chat_completion.choices[0].message.content.strip()
+        cleaned_response = cleaned_response.replace("\\n", "\n")  # New line characters
+        cleaned_response = cleaned_response.replace("\\", "")  # Remove backslashes
+
+        if lookup is not None:
+            total_tokens = chat_completion.usage.total_tokens if chat_completion.usage else 0
+            response_cache.store(lookup, cleaned_response, total_tokens)
+
+        return cleaned_response
+
+    if batch_flights is None:
+        return await complete()
+    key = lookup.key if lookup is not None else request_keys(
+        settings.llm.MODEL, messages, chat_input.max_tokens, settings.llm.TEMPERATURE
+    )[0]
+    return await batch_flights.do(key, complete)
+
+
+@api_router.get("/metrics", status_code=200)
+async def metrics() -> Response:
+    """
+    Exposes time to first token, inter-token latency, token counts and tokens per second of every LLM call in the
+    Prometheus text format.
 
-    if not chat_completion:
-        raise HTTPException(status_code=404, detail="Chat completion empty")
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+    return metrics_response()
 
-    cleaned_response = chat_completion.choices[0].message.content.strip()
-    cleaned_response = cleaned_response.replace("\\n", "\n")  # New line characters
-    cleaned_response = cleaned_response.replace("\\", "")  # Remove backslashes
 
-    return cleaned_response
+@api_router.get("/cache/stats", status_code=200)
+async def cache_stats(
+    response_cache: ResponseCache | None = Depends(deps.get_response_cache),
+) -> Any:
+    """
+    Reports the response cache's hit and miss counters and the upstream tokens its hits saved.
 
+    Args:
+        response_cache (ResponseCache | None): The response cache, or None if caching is disabled.
 
-async def stream_generator(response: AsyncStream) -> AsyncGenerator[str, None]:
+    Returns:
+        Any: The cache statistics, or {"enabled": False} if caching is disabled.
     """
-    Generates streaming content from the AI model's response.
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+
+async def stream_generator(
+    response: InstrumentedStream | Subscription[ChatCompletionChunk],
+) -> AsyncGenerator[str, None]:
+    """
+    Generates streaming content from the AI model's response, closing the response when it is closed itself.
 
     Args:
-        response (AsyncStream): The streaming response from the AI model.
+        response (InstrumentedStream | Subscription[ChatCompletionChunk]): The streaming response from the
+            AI model, or a subscription to a shared one.
 
     Yields:
-        str: Current content chunk from the AI model's response.
+        str: Current content chunk from the AI model's response; chunks without content are skipped.
     """
-    async for chunk in response:
-        current_content = chunk.choices[0].delta.content
-        yield current_content
+    try:
+        async for chunk in response:
+            current_content = chunk.choices[0].delta.content
+            if current_content:
+                yield current_content
+    finally:
+        # InstrumentedStream.close() releases the upstream connection, a shared-stream subscription has aclose()
+        close = getattr(response, "aclose", None) or response.close
+        await close()
 
 
 @api_router.post("/inference/stream/", status_code=200, response_model=str)
 async def run_chat_inference_stream(
+    request: Request,
     chat_input: ChatInput,
     llm_client: AsyncOpenAI | None = Depends(deps.get_llm_client),
+    stream_flights: StreamCoalescer[ChatCompletionChunk] | None = Depends(deps.get_stream_flights),
 ) -> Any:
     """
     Executes a streaming inference using the provided chat input and streams the AI model's response.
 
+    Identical requests that arrive while a stream is in flight share its upstream completion: they first receive
+    the tokens already produced, then follow the live stream. Tokens are sent as batched Server-Sent Events
+    (`data: {"content": ...}`) followed by a `done` event, and the upstream stream is closed as soon as the client
+    disconnects.
+
     Args:
+        request (Request): The request object, used to detect client disconnects.
         chat_input (ChatInput): The chat input containing the user's message and configuration for the inference.
         llm_client (AsyncOpenAI | None): The asynchronous OpenAI client, obtained via dependency injection.
+        stream_flights (StreamCoalescer[ChatCompletionChunk] | None): Shares in-flight streams, or None if
+            coalescing is disabled.
 
     Returns:
         Any: A streaming response with the AI model's outputs.
     """
-    response = await llm_client.chat.completions.create(
-        messages=[
-            {"role": "system", "content": "You are an AI assistant"},
-            {"role": "user", "content": chat_input.user_message},
-        ],
-        stream=True,
-        model=settings.llm.MODEL,
-        max_tokens=chat_input.max_tokens,
-        temperature=settings.llm.TEMPERATURE,
+    messages = [
+        {"role": "system", "content": "You are an AI assistant"},
+        {"role": "user", "content": chat_input.user_message},
+    ]
+
+    async def open_stream() -> InstrumentedStream:
+        call_metrics = LLMCallMetrics(model=settings.llm.MODEL, endpoint="stream")
+        try:
+            stream = await llm_client.chat.completions.create(
+                messages=messages,
+                stream=True,
+                model=settings.llm.MODEL,
+                max_tokens=chat_input.max_tokens,
+                temperature=settings.llm.TEMPERATURE,
+            )
+        except Exception:
+            call_metrics.finish(status="error")
+            raise
+        return InstrumentedStream(stream, call_metrics)
+
+    if stream_flights is None:
+        response = await open_stream()
+    else:
+        key = request_keys(settings.llm.MODEL, messages, chat_input.max_tokens, settings.llm.TEMPERATURE)[0]
+        response = await stream_flights.subscribe(key, open_stream)
+    events = sse_stream(
+        request,
+        stream_generator(response),
+        flush_tokens=settings.streaming.FLUSH_TOKENS,
+        flush_interval_ms=settings.streaming.FLUSH_INTERVAL_MS,
+        queue_size=settings.streaming.QUEUE_SIZE,
     )
-    return StreamingResponse(stream_generator(response), media_type="text/event-stream")
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 app.include_router(api_router)
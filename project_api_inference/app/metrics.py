@@ -0,0 +1,63 @@
+from typing import AsyncGenerator, Optional
+
+from fastapi import Response
+from openai import AsyncStream
+from openai.types.chat import ChatCompletionChunk
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+# the metric definitions are shared with the part 2 llama.cpp scripts, so every process reports the same series
+from shared.llm_metrics import LLMCallMetrics  # noqa: F401 (re-exported)
+
+
+class InstrumentedStream:
+    """
+    Wraps an upstream chat completion stream, recording the call's metrics as its chunks are read.
+
+    It is iterated and closed like the AsyncStream it wraps. A stream closed before it ends is recorded as cancelled.
+
+    Attributes:
+        stream (AsyncStream[ChatCompletionChunk]): The upstream stream.
+        metrics (LLMCallMetrics): The metrics of the call that opened the stream.
+    """
+
+    def __init__(self, stream: AsyncStream[ChatCompletionChunk], metrics: LLMCallMetrics) -> None:
+        self.stream = stream
+        self.metrics = metrics
+
+    async def __aiter__(self) -> AsyncGenerator[ChatCompletionChunk, None]:
+        prompt_tokens = completion_tokens = None
+        try:
+            async for chunk in self.stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    self.metrics.token()
+                # some OpenAI-compatible servers (Together included) report usage on the last chunk
+                usage = getattr(chunk, "usage", None)
+                if usage:
+                    prompt_tokens = _usage_field(usage, "prompt_tokens")
+                    completion_tokens = _usage_field(usage, "completion_tokens")
+                yield chunk
+        except Exception:
+            self.metrics.finish(status="error")
+            raise
+        self.metrics.finish(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    async def close(self) -> None:
+        """
+        Closes the upstream stream.
+        """
+        self.metrics.finish(status="cancelled")
+        await self.stream.close()
+
+
+def _usage_field(usage: object, name: str) -> Optional[int]:
+    return usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+
+
+def metrics_response() -> Response:
+    """
+    Renders every metric in the Prometheus text exposition format.
+
+    Returns:
+        Response: The metrics, for a /metrics endpoint.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
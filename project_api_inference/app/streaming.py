@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS: Dict[str, str] = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop nginx-style proxies from buffering the stream
+}
+
+_END = object()
+
+
+def format_sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """
+    Formats a payload as one Server-Sent Event.
+
+    The payload is JSON-encoded, so newlines in the generated text cannot break the event framing.
+
+    Args:
+        data (Dict[str, Any]): The event payload.
+        event (str | None): The event type; omitted for plain `message` events.
+
+    Returns:
+        str: The event, terminated by a blank line.
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _pump(tokens: AsyncGenerator[str, None], queue: asyncio.Queue) -> None:
+    # The queue is bounded, so a slow client stops the upstream stream being read faster than it is sent
+    try:
+        async for token in tokens:
+            if token:
+                await queue.put(token)
+        await queue.put(_END)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.exception("Upstream stream failed")
+        await queue.put(e)
+    finally:
+        await tokens.aclose()
+
+
+async def sse_stream(
+    request: Request,
+    tokens: AsyncGenerator[str, None],
+    flush_tokens: int,
+    flush_interval_ms: float,
+    queue_size: int,
+) -> AsyncGenerator[str, None]:
+    """
+    Relays generated tokens to the client as Server-Sent Events, batching tokens into fewer, larger events.
+
+    Buffered tokens are flushed as one `data:` event once `flush_tokens` have accumulated or `flush_interval_ms`
+    has passed since the first of them arrived, whichever comes first. The stream ends with a `done` event, or an
+    `error` event if the upstream stream fails. The client connection is checked at every flush, and at least once
+    per interval while the upstream stalls; once it is gone, the upstream stream is closed immediately so it stops
+    generating (and billing) tokens nobody will read.
+
+    Args:
+        request (Request): The streaming request, used to detect client disconnects.
+        tokens (AsyncGenerator[str, None]): The generated tokens; closed when the client leaves or the stream ends.
+        flush_tokens (int): The number of tokens that triggers a flush.
+        flush_interval_ms (float): The longest a token waits in the buffer before it is flushed.
+        queue_size (int): The number of tokens read ahead of the client before upstream reads pause.
+
+    Yields:
+        str: Formatted Server-Sent Events.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    pump = asyncio.create_task(_pump(tokens, queue))
+    buffer: List[str] = []
+    deadline: Optional[float] = None
+    try:
+        while True:
+            # Without buffered tokens, wake up every interval anyway to notice clients that left during a stall
+            timeout = deadline - time.monotonic() if deadline is not None else flush_interval_ms / 1000
+            try:
+                item = await asyncio.wait_for(queue.get(), max(0.0, timeout))
+            except asyncio.TimeoutError:
+                item = None
+
+            if isinstance(item, str):
+                buffer.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + flush_interval_ms / 1000
+                if len(buffer) < flush_tokens and time.monotonic() < deadline:
+                    continue
+
+            if await request.is_disconnected():
+                logger.info("Client disconnected, closing the upstream stream")
+                return
+            if buffer:
+                yield format_sse({"content": "".join(buffer)})
+                buffer.clear()
+                deadline = None
+
+            if item is _END:
+                yield format_sse({}, event="done")
+                return
+            if isinstance(item, Exception):
+                yield format_sse({"detail": "Upstream stream failed"}, event="error")
+                return
+    finally:
+        # Runs on completion, on disconnect, and when the server cancels the response
+        pump.cancel()
+        try:
+            await pump
+        except asyncio.CancelledError:
+            pass
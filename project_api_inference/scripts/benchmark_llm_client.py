@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Set
+
+import uvicorn
+from fastapi import FastAPI, Request
+from openai import AsyncOpenAI
+
+from app import deps
+from app.config import settings
+
+STUB_HOST: str = "127.0.0.1"
+STUB_PORT: int = 8765
+
+stub_app: FastAPI = FastAPI(title="Stub OpenAI-compatible server")
+stub_connections: Set[int] = set()
+
+
+@stub_app.post("/v1/chat/completions")
+async def chat_completions(request: Request) -> Any:
+    """
+    Answers every chat completion request with the same short completion, recording the client port so the number
+    of distinct connections can be reported.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        Any: A minimal OpenAI chat completion payload.
+    """
+    stub_connections.add(request.client.port)
+    body = await request.json()
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body["model"],
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": "Paris is in France."}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def start_stub_server() -> uvicorn.Server:
+    """
+    Runs the stub server on a background thread and waits until it accepts requests.
+
+    Returns:
+        uvicorn.Server: The running server, so it can be stopped.
+    """
+    server = uvicorn.Server(uvicorn.Config(stub_app, host=STUB_HOST, port=STUB_PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def complete(client: AsyncOpenAI) -> None:
+    """
+    Sends one chat completion request, as the /inference/batch/ endpoint does.
+
+    Args:
+        client (AsyncOpenAI): The client to send the request with.
+    """
+    await client.chat.completions.create(
+        messages=[{"role": "user", "content": "Tell me about Paris"}],
+        model=settings.llm.MODEL,
+        max_tokens=10,
+    )
+
+
+async def run(
+    label: str, request: Callable[[], Awaitable[None]], n_requests: int, concurrency: int
+) -> None:
+    """
+    Sends `n_requests` requests, `concurrency` at a time, and prints latency percentiles and the connection count.
+
+    Args:
+        label (str): The name of the measured variant.
+        request (Callable[[], Awaitable[None]]): Sends one request.
+        n_requests (int): The total number of requests.
+        concurrency (int): The number of requests in flight at once.
+    """
+    stub_connections.clear()
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: List[float] = []
+
+    async def timed() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await request()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[timed() for _ in range(n_requests)])
+    wall = time.perf_counter() - start
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<12} mean={statistics.mean(timings):7.2f}ms  p50={statistics.median(timings):7.2f}ms  "
+        f"p95={p95:7.2f}ms  {n_requests / wall:7.1f} req/s  connections={len(stub_connections)}"
+    )
+
+
+async def main() -> None:
+    """
+    Compares a new AsyncOpenAI client per request (the old `get_llm_client`) with the shared, pooled client.
+
+    The stub server answers over plain HTTP on localhost, so the saving shown here is only the TCP connect and
+    client construction. Against the real API every new connection also pays DNS resolution and a TLS handshake.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark per-request vs shared AsyncOpenAI clients.")
+    parser.add_argument("--requests", "-n", type=int, default=500)
+    parser.add_argument("--concurrency", "-c", type=int, default=10)
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    base_url = f"http://{STUB_HOST}:{STUB_PORT}/v1"
+
+    async def per_request_client() -> None:
+        client = AsyncOpenAI(api_key="stub", base_url=base_url)
+        try:
+            await complete(client)
+        finally:
+            await client.close()
+
+    settings.llm.BASE_URL = base_url
+    shared_client = deps.create_llm_client()
+
+    await complete(shared_client)  # warm-up
+    await run("per-request", per_request_client, args.requests, args.concurrency)
+    await run("shared", lambda: complete(shared_client), args.requests, args.concurrency)
+
+    await shared_client.close()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
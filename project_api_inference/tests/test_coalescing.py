@@ -0,0 +1,63 @@
+import asyncio
+from typing import AsyncIterator, List
+
+from app.coalescing import StreamCoalescer
+
+CHUNKS = list(range(5))
+
+
+class FakeUpstream:
+    """An upstream stream yielding CHUNKS, one per event loop turn, that records whether it was closed."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def _chunks(self) -> AsyncIterator[int]:
+        for chunk in CHUNKS:
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    def __aiter__(self) -> AsyncIterator[int]:
+        return self._chunks()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_subscriber_not_yet_reading_keeps_the_stream_alive():
+    async def scenario() -> List[int]:
+        coalescer: StreamCoalescer[int] = StreamCoalescer()
+        upstream = FakeUpstream()
+
+        async def open_stream() -> FakeUpstream:
+            return upstream
+
+        a = await coalescer.subscribe("key", open_stream)
+        b = await coalescer.subscribe("key", open_stream)
+        # A disconnects after B has subscribed, but before B reads its first chunk
+        await a.__anext__()
+        await a.aclose()
+        await asyncio.sleep(0.02)
+        assert not upstream.closed
+        return [chunk async for chunk in b]
+
+    assert asyncio.run(scenario()) == CHUNKS
+
+
+def test_last_subscriber_leaving_closes_the_stream():
+    async def scenario() -> FakeUpstream:
+        coalescer: StreamCoalescer[int] = StreamCoalescer()
+        upstream = FakeUpstream()
+
+        async def open_stream() -> FakeUpstream:
+            return upstream
+
+        a = await coalescer.subscribe("key", open_stream)
+        await coalescer.subscribe("key", open_stream)  # dropped without ever being read
+        await a.__anext__()
+        await a.aclose()
+        await asyncio.sleep(0.02)
+        assert len(coalescer) == 0
+        return upstream
+
+    assert asyncio.run(scenario()).closed
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
-from typing import Iterator
+from functools import lru_cache
+from typing import Any, Dict, Iterator
 import argparse
 import logging
 
@@ -18,6 +19,36 @@ from app.config import settings
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+SUMMARY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {
+            "type": "string",
+            "minLength": 200,
+            "maxLength": 300,
+            "description": "A brief summary of the interview content."
+        },
+        "quote": {
+            "type": "string",
+            "description": "A quote from the interview subject that captures a key theme of the podcast."
+        },
+        "interview_date": {
+            "type": "string",
+            "format": "date",
+            "description": "The date when the interview was conducted."
+        }
+    },
+    "required": [
+        "summary",
+        "interview_date",
+    ]
+}
+
+@lru_cache(maxsize=None)
+def summary_grammar() -> LlamaGrammar:
+    # compiled once per process rather than on every request; llama.cpp resets its state before each generation
+    return LlamaGrammar.from_json_schema(json.dumps(SUMMARY_SCHEMA), verbose=False)
+
 def load_system_prompt() -> str:
     with open(PROMPT_DIR / "summarize_podcast_transcript.md.j2", "r") as file:
         return file.read()
@@ -48,33 +79,7 @@ def prepare_output(
         max_tokens=settings.llm.MAX_TOKENS,
         stop=[],
         temperature=settings.llm.TEMPERATURE,
-        response_format={
-            "type": "json_object",
-            "schema": {
-              "type": "object",
-              "properties": {
-                "summary": {
-                  "type": "string",
-                  "minLength": 200,
-                  "maxLength": 300,
-                  "description": "A brief summary of the interview content."
-                },
-                "quote": {
-                  "type": "string",
-                  "description": "A quote from the interview subject that captures a key theme of the podcast."
-                },
-                "interview_date": {
-                  "type": "string",
-                  "format": "date",
-                  "description": "The date when the interview was conducted."
-                }
-              },
-              "required": [
-                "summary",
-                "interview_date",
-              ]
-            }
-        }
+        grammar=summary_grammar(),
     )
     return result['choices'][0]['message']['content']
 
@@ -22,6 +22,7 @@ fileConfig(config.config_file_name)
 # target_metadata = None
 
 from app.db.base_class import Base  # noqa
+from app.config import settings
 from app.db.session import SQLALCHEMY_DATABASE_URI
 from app.models.podcast import Podcast, Episode, Summary
 
@@ -71,7 +72,7 @@ async def run_async_migrations() -> None:
     # Using create_async_engine instead of engine_from_config
     connectable: AsyncEngine = create_async_engine(
         configuration["sqlalchemy.url"],
-        echo=True,
+        echo=settings.database.SQL_ECHO,
     )
 
     async with connectable.connect() as connection:
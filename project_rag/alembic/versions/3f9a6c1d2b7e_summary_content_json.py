@@ -0,0 +1,57 @@
+"""summary content as json
+
+Revision ID: 3f9a6c1d2b7e
+Revises: 728c3af72e3d
+Create Date: 2024-05-18 10:12:41.208113
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a6c1d2b7e'
+down_revision = '728c3af72e3d'
+branch_labels = None
+depends_on = None
+
+summary = sa.table('summary', sa.column('id', sa.Integer), sa.column('content', sa.Text))
+
+
+def _decode(content):
+    # update_db used to store json.dumps() of the file text, i.e. a JSON string holding the JSON document
+    value = json.loads(content)
+    while isinstance(value, str):
+        value = json.loads(value)
+    return value
+
+
+def upgrade():
+    # normalize the stored text to one JSON document per row before the column type changes
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(summary.c.id, summary.c.content).where(summary.c.content.is_not(None)))
+    for row_id, content in rows.fetchall():
+        try:
+            value = _decode(content)
+        except ValueError:
+            value = {"summary": content}
+        connection.execute(summary.update().where(summary.c.id == row_id).values(content=json.dumps(value)))
+
+    if connection.dialect.name == 'postgresql':
+        op.alter_column('summary', 'content', type_=postgresql.JSONB(), postgresql_using='content::jsonb')
+    else:
+        # SQLite cannot alter a column type in place; batch mode copies the table
+        with op.batch_alter_table('summary') as batch_op:
+            batch_op.alter_column('content', type_=sa.JSON(), existing_nullable=True)
+
+
+def downgrade():
+    connection = op.get_bind()
+    if connection.dialect.name == 'postgresql':
+        op.alter_column('summary', 'content', type_=sa.Text(), postgresql_using='content::text')
+    else:
+        with op.batch_alter_table('summary') as batch_op:
+            batch_op.alter_column('content', type_=sa.Text(), existing_nullable=True)
@@ -0,0 +1,34 @@
+"""episode unique title per podcast
+
+Revision ID: 8d2e4b7a9c15
+Revises: 3f9a6c1d2b7e
+Create Date: 2024-05-25 09:41:07.553902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4b7a9c15'
+down_revision = '3f9a6c1d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # init_db used to add the episodes again on every run: keep the first copy of each, as update_db did
+    duplicates = (
+        "SELECT id FROM episode WHERE id NOT IN "
+        "(SELECT MIN(id) FROM episode GROUP BY podcast_id, title)"
+    )
+    op.execute(sa.text(f"DELETE FROM summary WHERE episode_id IN ({duplicates})"))
+    op.execute(sa.text(f"DELETE FROM episode WHERE id IN ({duplicates})"))
+    # batch mode, as SQLite cannot add a constraint to an existing table
+    with op.batch_alter_table('episode') as batch_op:
+        batch_op.create_unique_constraint('uq_episode_podcast_id_title', ['podcast_id', 'title'])
+
+
+def downgrade():
+    with op.batch_alter_table('episode') as batch_op:
+        batch_op.drop_constraint('uq_episode_podcast_id_title', type_='unique')
@@ -2,6 +2,7 @@ import pathlib
 from typing import Optional
 
 from dotenv import load_dotenv
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 load_dotenv()
@@ -24,6 +25,9 @@ class LLMSettings(BaseSettings):
         MAX_TOKENS (int): The maximum number of tokens to be generated in one response.
         TEMPERATURE (float): The temperature setting for the LLM's creativity in responses.
         MODEL (str): The identifier for the LLM model to be used.
+        MODEL_FILE_NAME (str): The local GGUF model file (in MODEL_DIR) used to summarize transcripts.
+        CHAT_FORMAT (str): The llama.cpp chat format of the local model.
+        SIMILARITY_TOP_K (int): The number of index nodes retrieved to answer a RAG query.
         TOGETHER_API_KEY (str): The API key for accessing the LLM, expected to be loaded from the environment.
     """
     CONTEXT_WINDOW: int = 16000
@@ -31,18 +35,117 @@ class LLMSettings(BaseSettings):
     MAX_TOKENS: int = 512
     TEMPERATURE: float = 0.8
     MODEL: str = "mistralai/Mixtral-8x7B-Instruct-v0.1"
+    MODEL_FILE_NAME: str = "mistral-7b-instruct-v0.2.Q4_K_M.gguf"
+    CHAT_FORMAT: str = "mistral-instruct"
+    SIMILARITY_TOP_K: int = 2
     TOGETHER_API_KEY: str  # picked up from environment
 
+class EmbeddingSettings(BaseSettings):
+    """
+    Defines the settings for the embedding model used to build and query the RAG index.
+
+    Attributes:
+        MODEL_NAME (str): The HuggingFace identifier of the embedding model.
+        BATCH_SIZE (int): The number of chunks embedded per forward pass when building the index.
+        NUM_WORKERS (int): The number of processes (each with its own model copy) used when building the index.
+        CACHE_PATH (pathlib.Path): The SQLite file caching chunk embeddings across index builds.
+        QUERY_BATCH_SIZE (int): The largest number of concurrent RAG queries embedded in one forward pass.
+        QUERY_BATCH_WAIT_MS (float): How long a RAG query waits for others to share its forward pass.
+        QUERY_CACHE_SIZE (int): The number of recent query embeddings kept in memory.
+    """
+    MODEL_NAME: str = "WhereIsAI/UAE-Large-V1"
+    BATCH_SIZE: int = 32
+    NUM_WORKERS: int = 1
+    CACHE_PATH: pathlib.Path = ROOT / 'data' / 'embedding_cache.sqlite3'
+    QUERY_BATCH_SIZE: int = 16
+    QUERY_BATCH_WAIT_MS: float = 5
+    QUERY_CACHE_SIZE: int = 1024
+
+class SummarizationSettings(BaseSettings):
+    """
+    Defines the settings for batch transcript summarization with local llama.cpp workers.
+
+    Attributes:
+        NUM_WORKERS (int): The number of worker processes, each with a resident model; 0 sizes the pool to cores and RAM.
+        THREADS_PER_WORKER (int): The number of llama.cpp threads each worker uses.
+        KV_CACHE_BYTES_PER_TOKEN (int): The KV cache memory per context token (128KiB for Mistral 7B in f16).
+        WORKER_OVERHEAD_BYTES (int): The memory each worker needs besides the KV cache and the shared model weights.
+        CHUNKED_CONTEXT_WINDOW (int): The context window of each worker in chunked (map-reduce) mode.
+        CHUNK_TOKENS (int): The maximum size of a transcript chunk summarized in the map step.
+        CHUNK_OVERLAP_TOKENS (int): The number of tokens of trailing sentences repeated at the start of the next chunk.
+        CHUNK_SUMMARY_MAX_TOKENS (int): The maximum length of the notes on one chunk.
+        PROMPT_CACHE_ENABLED (bool): Whether workers reuse the KV state of the system prompts across transcripts.
+        PROMPT_CACHE_BYTES (int): The memory each worker may use for those states.
+        PERSIST_PROMPT_CACHE (bool): Whether those states are kept on disk between runs by default.
+        PROMPT_CACHE_DIR (pathlib.Path): Where persisted states are kept, one file per model, context size and prompt.
+    """
+    NUM_WORKERS: int = 0
+    THREADS_PER_WORKER: int = 4
+    KV_CACHE_BYTES_PER_TOKEN: int = 128 * 1024
+    WORKER_OVERHEAD_BYTES: int = 512 * 1024 * 1024
+    CHUNKED_CONTEXT_WINDOW: int = 4096
+    CHUNK_TOKENS: int = 2048
+    CHUNK_OVERLAP_TOKENS: int = 128
+    CHUNK_SUMMARY_MAX_TOKENS: int = 256
+    PROMPT_CACHE_ENABLED: bool = True
+    PROMPT_CACHE_BYTES: int = 2 * 1024 * 1024 * 1024
+    PERSIST_PROMPT_CACHE: bool = False
+    PROMPT_CACHE_DIR: pathlib.Path = ROOT / 'data' / 'prompt_cache'
+
+    @model_validator(mode="after")
+    def check_chunk_summary_size(self) -> "SummarizationSettings":
+        # the notes on a chunk must be shorter than the chunk, or reducing them never fits in the context window
+        if self.CHUNK_SUMMARY_MAX_TOKENS >= self.CHUNK_TOKENS:
+            raise ValueError("CHUNK_SUMMARY_MAX_TOKENS must be smaller than CHUNK_TOKENS")
+        return self
+
+class DatabaseSettings(BaseSettings):
+    """
+    Defines the settings of the database engine.
+
+    Attributes:
+        SQL_ECHO (bool): Whether every SQL statement is logged, for debugging.
+        QUERY_CACHE_SIZE (int): The number of compiled SQL statements SQLAlchemy keeps per engine.
+        POOL_SIZE (int): The number of connections kept open in the pool.
+        MAX_OVERFLOW (int): The number of connections opened beyond POOL_SIZE under load, closed when returned.
+        POOL_TIMEOUT (float): How long a request waits for a free connection before failing, in seconds.
+        POOL_RECYCLE (int): The age in seconds after which a connection is replaced, before the server drops it.
+        POOL_PRE_PING (bool): Whether a pooled connection is checked before use (Postgres).
+        STATEMENT_CACHE_SIZE (int): The number of prepared statements asyncpg keeps per connection (Postgres).
+        SQLITE_JOURNAL_MODE (str): The SQLite journal mode; WAL lets readers run alongside a writer.
+        SQLITE_SYNCHRONOUS (str): The SQLite fsync level; NORMAL is durable against crashes of the app in WAL mode.
+        SQLITE_MMAP_SIZE (int): The bytes of the SQLite file read through a memory map rather than read() calls.
+        SQLITE_BUSY_TIMEOUT (float): How long a SQLite connection waits for a lock before failing, in seconds.
+    """
+    SQL_ECHO: bool = False
+    QUERY_CACHE_SIZE: int = 500
+    POOL_SIZE: int = 5
+    MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: float = 30
+    POOL_RECYCLE: int = 1800
+    POOL_PRE_PING: bool = True
+    STATEMENT_CACHE_SIZE: int = 100
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT: float = 5
+
 class Settings(BaseSettings):
     """
     Configuration settings for the application, including database and LLM configurations.
 
     Attributes:
-        SQLALCHEMY_DATABASE_URI (Optional[str]): The database connection URI.
+        SQLALCHEMY_DATABASE_URI (Optional[str]): The database connection URI (sqlite:// or postgresql://).
+        database (DatabaseSettings): Nested settings for the database engine.
         llm (LLMSettings): Nested settings for configuring the Large Language Model.
+        embedding (EmbeddingSettings): Nested settings for configuring the embedding model.
+        summarization (SummarizationSettings): Nested settings for batch transcript summarization.
     """
     SQLALCHEMY_DATABASE_URI: Optional[str] = "sqlite:///example.db"
+    database: DatabaseSettings = DatabaseSettings()
     llm: LLMSettings = LLMSettings()
+    embedding: EmbeddingSettings = EmbeddingSettings()
+    summarization: SummarizationSettings = SummarizationSettings()
 
     class Config:
         """
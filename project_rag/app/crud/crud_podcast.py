@@ -1,10 +1,10 @@
 # app/crud/crud_podcast.py
-import json
-from typing import Any
+from typing import Any, Sequence
 
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
 from app.crud.base import CRUDBase
 from app.models.podcast import Podcast, Episode, Summary
@@ -18,27 +18,56 @@ podcast = CRUDPodcast(Podcast)
 
 
 class CRUDEpisode(CRUDBase[Episode, EpisodeCreate, EpisodeUpdate]):
-    async def get(self, db: AsyncSession, id: Any) -> Episode | None:
+    async def get(self, db: AsyncSession, id: Any, *, with_transcript: bool = False) -> Episode | None:
+        # Episode.transcript is deferred, so it is only read when asked for
         stmt = select(Episode).options(selectinload(Episode.summary)).filter(Episode.id == id)
+        if with_transcript:
+            stmt = stmt.options(undefer(Episode.transcript))
         result = await db.execute(stmt)
-        episode = result.scalars().first()
+        return result.scalars().first()
 
-        if episode and episode.summary and episode.summary.content:
-            # Assuming summary.content is a stringified JSON, parse it into a Python object
-            episode.summary.content = json.loads(episode.summary.content)
-
-        return episode
+    async def get_transcript(self, db: AsyncSession, id: Any) -> str | None:
+        stmt = select(Episode.transcript).filter(Episode.id == id)
+        result = await db.execute(stmt)
+        return result.scalars().first()
 
     async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> list[Episode]:
         stmt = select(Episode).options(selectinload(Episode.summary)).offset(skip).limit(limit)
         results = await db.execute(stmt)
-        episodes = results.scalars().all()
-        for episode in episodes:
-            if episode.summary and episode.summary.content:
-                # Assuming summary.content is a stringified JSON
-                # n.b. this is very inefficient
-                episode.summary.content = json.loads(episode.summary.content)
-        return episodes
+        return results.scalars().all()
+
+    async def get_multi_summary_fields(
+        self, db: AsyncSession, *, fields: Sequence[str] = ("summary", "quote"), skip: int = 0, limit: int = 100
+    ) -> list[RowMapping]:
+        """
+        Lists episodes with only the requested summary fields, extracted from the JSON column in SQL.
+
+        Only the extracted strings leave the database (`json_extract` on SQLite, `->>` on Postgres), so neither the
+        rest of the summary document nor the transcript is read into Python.
+
+        Args:
+            db (AsyncSession): The database session.
+            fields (Sequence[str]): The top-level summary keys to return, as strings (None when missing).
+            skip (int): The number of episodes to skip.
+            limit (int): The maximum number of episodes to return.
+
+        Returns:
+            list[RowMapping]: One mapping per episode with id, title, url and the requested fields.
+        """
+        stmt = (
+            select(
+                Episode.id,
+                Episode.title,
+                Episode.url,
+                *(Summary.content[field].as_string().label(field) for field in fields),
+            )
+            .outerjoin(Summary, Summary.episode_id == Episode.id)
+            .order_by(Episode.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        results = await db.execute(stmt)
+        return results.mappings().all()
 
 episode = CRUDEpisode(Episode)
 
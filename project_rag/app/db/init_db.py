@@ -3,9 +3,10 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app import crud
 from app.config import TRANSCRIPT_DIR
 from app.db.base_class import Base  # noqa: F401
-from app.models.podcast import Podcast, Episode
+from app.models.podcast import Podcast
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +44,7 @@ async def init_db(db: AsyncSession) -> None:
         },
         # Add more episodes as needed
     ]
-    # Create episodes with transcripts
+    # Create (or refresh) the episodes with transcripts, in one multi-row upsert
     episodes = []
     for entry in episodes_data:
         try:
@@ -54,20 +55,15 @@ async def init_db(db: AsyncSession) -> None:
             logger.error(f"Failed to read transcript file {entry['transcript_file']}: {e}")
             transcript = None  # Use None or some placeholder text if the transcript cannot be read
 
-        episode = Episode(
-            title=entry["title"],
-            url=entry["url"],
-            podcast=podcast,
-            transcript=transcript
-        )
-        episodes.append(episode)
+        episodes.append({
+            "title": entry["title"],
+            "url": entry["url"],
+            "podcast_id": podcast.id,
+            "transcript": transcript,
+        })
 
-    # Add the episodes to the session
-    db.add_all(episodes)
-    await db.flush()  # Flushing is necessary to populate the episodes with IDs before committing
-
-    # Commit the changes
-    await db.commit()
+    # Commits the podcast too; re-running updates the existing episodes instead of duplicating them
+    await crud.episode.upsert_many(db, objs_in=episodes, index_elements=["podcast_id", "title"])
 
     # Close the session
     await db.close()
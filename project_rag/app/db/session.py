@@ -1,13 +1,84 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URI = "sqlite+aiosqlite:///example.db"
+from app.config import DatabaseSettings, settings
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URI,
-    # No need for "check_same_thread" in async mode since aiosqlite handles async access
-    echo=True,  # Optional, for debugging
-)
+# The async driver used for each database
+ASYNC_DRIVERS: Dict[str, str] = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_uri(uri: str) -> str:
+    """
+    Points a database URI at the async driver of its database, e.g. sqlite:///example.db to sqlite+aiosqlite:///.
+
+    Args:
+        uri (str): The database URI, with or without a driver.
+
+    Returns:
+        str: The URI with the async driver, unchanged if it already names a driver.
+    """
+    url = make_url(uri.replace("postgres://", "postgresql://", 1))
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.drivername}+{ASYNC_DRIVERS[url.drivername]}")
+    return url.render_as_string(hide_password=False)
+
+
+def create_engine(uri: str, db_settings: DatabaseSettings) -> AsyncEngine:
+    """
+    Creates the async engine for a database URI, configured for the database it points to.
+
+    Postgres connections are pooled, checked before use and recycled, and asyncpg caches prepared statements on
+    each of them. SQLite connections get the journal mode, synchronous level and memory map of `db_settings`,
+    set on every new connection as these pragmas are per connection (WAL, once set, persists in the file).
+
+    Args:
+        uri (str): The database URI, with or without a driver.
+        db_settings (DatabaseSettings): The engine settings.
+
+    Returns:
+        AsyncEngine: The engine.
+    """
+    url = make_url(async_database_uri(uri))
+    kwargs: Dict[str, Any] = {
+        "echo": db_settings.SQL_ECHO,
+        "query_cache_size": db_settings.QUERY_CACHE_SIZE,
+    }
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"timeout": db_settings.SQLITE_BUSY_TIMEOUT}
+        if url.database not in (None, "", ":memory:"):
+            # in-memory databases live in a single connection, so only a file database has a pool
+            kwargs.update(pool_size=db_settings.POOL_SIZE, max_overflow=db_settings.MAX_OVERFLOW)
+        engine = create_async_engine(url, **kwargs)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={db_settings.SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={db_settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA mmap_size={int(db_settings.SQLITE_MMAP_SIZE)}")
+            cursor.close()
+
+        return engine
+
+    kwargs.update(
+        pool_size=db_settings.POOL_SIZE,
+        max_overflow=db_settings.MAX_OVERFLOW,
+        pool_timeout=db_settings.POOL_TIMEOUT,
+        pool_recycle=db_settings.POOL_RECYCLE,
+        pool_pre_ping=db_settings.POOL_PRE_PING,
+    )
+    if url.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {"prepared_statement_cache_size": db_settings.STATEMENT_CACHE_SIZE}
+    return create_async_engine(url, **kwargs)
+
+
+SQLALCHEMY_DATABASE_URI = async_database_uri(settings.SQLALCHEMY_DATABASE_URI)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URI, settings.database)
 
 # AsyncSession configuration
 AsyncSessionLocal = sessionmaker(
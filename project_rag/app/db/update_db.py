@@ -4,9 +4,10 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.config import TRANSCRIPT_DIR, SUMMARY_DIR
+from app import crud
+from app.config import SUMMARY_DIR
 from app.db.base_class import Base  # noqa: F401
-from app.models.podcast import Podcast, Episode, Summary
+from app.models.podcast import Podcast, Episode
 
 logger = logging.getLogger(__name__)
 
@@ -43,37 +44,33 @@ async def update_db(db: AsyncSession) -> None:
         # Add more episodes as needed
     ]
 
-    # Iterate over episodes to read summaries and update
+    # Read the summary files
+    summaries_by_title = {}
     for entry in episodes_data:
-        # Read the summary file
         try:
             summary_path = SUMMARY_DIR / entry["summary_file"]
             with open(summary_path, 'r', encoding='utf-8') as file:
-                summary_text = file.read()
+                summaries_by_title[entry["title"]] = json.load(file)
         except IOError as e:
             logger.error(f"Failed to read summary file {entry['summary_file']}: {e}")
             continue  # Skip this episode if summary file can't be read
+        except ValueError as e:
+            logger.error(f"Summary file {entry['summary_file']} is not valid JSON: {e}")
+            continue
+
+    # Fetch the ids of all the corresponding episodes in one query
+    episode_result = await db.execute(
+        select(Episode.id, Episode.title).where(
+            Episode.title.in_(summaries_by_title), Episode.podcast_id == podcast.id
+        )
+    )
+    summaries = [
+        {"episode_id": episode_id, "content": summaries_by_title[title]}  # the JSON column encodes the dict itself
+        for episode_id, title in episode_result.all()
+    ]
 
-        # Fetch the corresponding episode from the database
-        episode_result = await db.execute(select(Episode).where(Episode.title == entry['title'], Episode.podcast_id == podcast.id))
-        episode = episode_result.scalars().first()
-
-        if episode:
-            # This check might cause lazy-loading outside an async context
-            # if episode.summary:
-
-            # Instead, directly check if a summary exists by attempting to fetch it
-            summary_result = await db.execute(select(Summary).where(Summary.episode_id == episode.id))
-            summary = summary_result.scalars().first()
-
-            if summary:
-                summary.content = json.dumps(summary_text)  # Serialize the Python dict to a JSON string
-            else:
-                new_summary = Summary(content=summary_text, episode_id=episode.id)
-                db.add(new_summary)
-
-    # Commit the changes to the database
-    await db.commit()
+    # Insert the new summaries and replace the existing ones in one multi-row upsert, which commits the changes
+    await crud.summary.upsert_many(db, objs_in=summaries, index_elements=["episode_id"])
 
     # Close the session
-    await db.close()
\ No newline at end of file
+    await db.close()
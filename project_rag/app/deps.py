@@ -19,20 +19,26 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as db:
         yield db
 
-def get_llm() -> TogetherLLM:
+def get_llm(model: str = settings.llm.MODEL, temperature: float = settings.llm.TEMPERATURE) -> TogetherLLM:
     """
     Configures and returns a TogetherLLM instance.
 
     This function initializes a TogetherLLM object with configuration parameters specified in the application settings.
     It sets up the Large Language Model (LLM) with the appropriate model, API key, maximum token count, and context window
-    size for use in processing language-based tasks.
+    size for use in processing language-based tasks. Each instance owns its own HTTP client, so callers should build it
+    once and reuse it (see `app.engine_registry.QueryEngineRegistry`) rather than calling this per request.
+
+    Args:
+        model (str): The identifier of the model to query.
+        temperature (float): The sampling temperature for the model.
 
     Returns:
         TogetherLLM: An instance of TogetherLLM configured for language model operations.
     """
     return TogetherLLM(
-        model=settings.llm.MODEL,
+        model=model,
         api_key=settings.llm.TOGETHER_API_KEY,
         max_tokens=settings.llm.MAX_TOKENS,
+        temperature=temperature,
         context_window=settings.llm.CONTEXT_WINDOW
     )
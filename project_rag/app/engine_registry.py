@@ -0,0 +1,85 @@
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+from llama_index.core.indices.base import BaseIndex, BaseQueryEngine
+from llama_index.core.llms import LLM
+
+from app.config import settings
+
+
+class QueryEngineKey(NamedTuple):
+    """
+    Identifies a cached query engine.
+
+    Attributes:
+        model (str): The identifier of the LLM that synthesizes the response.
+        temperature (float): The sampling temperature used by the LLM.
+        similarity_top_k (int): The number of nodes fetched by the retriever.
+    """
+    model: str
+    temperature: float
+    similarity_top_k: int
+
+
+class QueryEngineRegistry:
+    """
+    Holds long-lived streaming query engines built on top of a single RAG index.
+
+    Building a query engine creates a retriever, a response synthesizer and a prompt helper, and
+    building the LLM creates a new HTTP client. None of these hold per-query state, so they are
+    built once per (model, temperature, top-k) combination and reused across requests.
+
+    Attributes:
+        index (BaseIndex): The index that every query engine retrieves from.
+        llm_factory (Callable[[str, float], LLM]): Builds an LLM for a model and temperature.
+    """
+
+    def __init__(self, index: BaseIndex, llm_factory: Callable[[str, float], LLM]) -> None:
+        self.index = index
+        self.llm_factory = llm_factory
+        self._engines: Dict[QueryEngineKey, BaseQueryEngine] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        similarity_top_k: Optional[int] = None,
+    ) -> BaseQueryEngine:
+        """
+        Returns the query engine for the given configuration, building it on first use.
+
+        Args:
+            model (Optional[str]): The LLM identifier, defaults to the configured model.
+            temperature (Optional[float]): The sampling temperature, defaults to the configured temperature.
+            similarity_top_k (Optional[int]): The number of nodes to retrieve, defaults to the configured value.
+
+        Returns:
+            BaseQueryEngine: A streaming query engine for the requested configuration.
+        """
+        key = QueryEngineKey(
+            model=model or settings.llm.MODEL,
+            temperature=settings.llm.TEMPERATURE if temperature is None else temperature,
+            similarity_top_k=similarity_top_k or settings.llm.SIMILARITY_TOP_K,
+        )
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            # another request may have built the engine while we waited for the lock
+            if key not in self._engines:
+                llm = self.llm_factory(key.model, key.temperature)
+                self._engines[key] = self.index.as_query_engine(
+                    streaming=True,
+                    llm=llm,
+                    similarity_top_k=key.similarity_top_k,
+                )
+            return self._engines[key]
+
+    def clear(self) -> None:
+        """
+        Drops every cached query engine.
+        """
+        with self._lock:
+            self._engines.clear()
@@ -1,21 +1,28 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, AsyncGenerator, Dict
+from typing import Any, AsyncGenerator, Dict, Optional
 
-from fastapi import FastAPI, APIRouter, HTTPException, Request, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response, Depends
 from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
 from llama_index.core import StorageContext, load_index_from_storage, VectorStoreIndex
+from llama_index.core.base.response.schema import AsyncStreamingResponse
 from llama_index.core.indices.base import BaseIndex, BaseQueryEngine
+from llama_index.core.schema import QueryBundle
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.llms.openai_like import OpenAILike
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app import deps
-from app.config import INDEX_DIR
+from app.config import INDEX_DIR, settings
+from app.engine_registry import QueryEngineRegistry
+from app.metrics import LLMCallMetrics, metrics_response, track_tokens
+from app.pagination import decode_cursor, encode_cursor
+from app.query_embedder import QueryEmbeddingBatcher
+from app.vector_store import NumpyVectorStore
 from app.schemas.chatbot import ChatInput
-from app.schemas.podcast import Episode
+from app.schemas.podcast import Episode, EpisodePage
 
 # Project Directories
 ROOT: Path = Path(__file__).resolve().parent.parent
@@ -25,18 +32,20 @@ TEMPLATES = Jinja2Templates(directory=str(BASE_PATH / "templates"))
 # Global index storage
 INDEX: Dict[str, Any] = {}
 
-async def load_rag_index(index_dir: Path) -> BaseIndex:
+async def load_rag_index(index_dir: Path, embed_model: HuggingFaceEmbedding) -> BaseIndex:
     """
     Asynchronously loads the RAG index from the specified directory.
 
     Args:
         index_dir (Path): The directory path where the index is stored.
+        embed_model (HuggingFaceEmbedding): The embedding model the index was built with.
 
     Returns:
         BaseIndex: The loaded index.
     """
-    storage_context = StorageContext.from_defaults(persist_dir=index_dir)
-    embed_model = HuggingFaceEmbedding(model_name="WhereIsAI/UAE-Large-V1")
+    # the embedding matrix is memory-mapped rather than parsed from JSON
+    vector_store = NumpyVectorStore.from_persist_dir(index_dir)
+    storage_context = StorageContext.from_defaults(persist_dir=index_dir, vector_store=vector_store)
     return load_index_from_storage(storage_context, embed_model=embed_model)
 
 @asynccontextmanager
@@ -51,9 +60,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         None
     """
     # Startup logic
-    INDEX['rag_index'] = await load_rag_index(index_dir=INDEX_DIR)
+    embed_model = HuggingFaceEmbedding(model_name=settings.embedding.MODEL_NAME)
+    INDEX['rag_index'] = await load_rag_index(index_dir=INDEX_DIR, embed_model=embed_model)
+    INDEX['query_engines'] = QueryEngineRegistry(index=INDEX['rag_index'], llm_factory=deps.get_llm)
+    INDEX['query_engines'].get()  # build the default engine before the first request arrives
+    INDEX['query_embedder'] = QueryEmbeddingBatcher(
+        embed_model=embed_model,
+        max_batch_size=settings.embedding.QUERY_BATCH_SIZE,
+        max_wait_ms=settings.embedding.QUERY_BATCH_WAIT_MS,
+        cache_size=settings.embedding.QUERY_CACHE_SIZE,
+    )
+    await INDEX['query_embedder'].start()
     yield  # Yield control back to the event loop
     # Shutdown logic
+    await INDEX['query_embedder'].stop()
     INDEX.clear()
 
 app = FastAPI(title="Podcast Summarizer", lifespan=lifespan)
@@ -74,9 +94,39 @@ async def root(
     Returns:
         Any: A template response rendering the homepage.
     """
-    episodes = await crud.episode.get_multi(db=db, limit=10)
+    # only the fields the page shows are read, extracted from the summary JSON in SQL
+    episodes = await crud.episode.get_multi_summary_fields(db=db, fields=("summary", "quote"), limit=10)
     return TEMPLATES.TemplateResponse("index.html", {"request": request, "episodes": episodes})
 
+@api_router.get("/episodes", status_code=200, response_model=EpisodePage)
+async def fetch_episodes(
+    *,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    Lists episodes in id order, one page at a time.
+
+    Pages are fetched by keyset rather than offset, so every page costs the same however deep it is.
+
+    Args:
+        cursor (Optional[str]): The `next_cursor` of the previous page, or None for the first page.
+        limit (int): The maximum number of episodes on the page.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        Any: The page of episodes and the cursor of the next page, or an HTTP 400 error if the cursor is invalid.
+    """
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # one row more than the page tells whether there is a next page without a COUNT
+    episodes = await crud.episode.get_page(db=db, after_id=after_id, limit=limit + 1)
+    next_cursor = encode_cursor(episodes[limit - 1].id) if len(episodes) > limit else None
+    return EpisodePage(items=episodes[:limit], next_cursor=next_cursor)
+
 @api_router.get("/episode/{episode_id}", status_code=200, response_model=Episode)
 async def fetch_episode(
     *,
@@ -101,22 +151,47 @@ async def fetch_episode(
 @api_router.post("/inference/stream/", status_code=200, response_model=str)
 async def run_chat_inference_stream(
     chat_input: ChatInput,
-    llm: OpenAILike = Depends(deps.get_llm),
 ) -> Any:
     """
     Streams the response of a chat inference query.
 
+    The whole query path is async: the query embedding is awaited from the batcher, retrieval and response
+    synthesis run through `aquery`, and tokens are relayed from the LLM's async stream, so a slow query or a
+    slow upstream model never blocks other requests on the worker.
+
     Args:
         chat_input (ChatInput): The input data for the chat query.
-        llm (OpenAILike): The LLM dependency for query processing.
 
     Returns:
         Any: A streaming response of the query result.
     """
-    index: VectorStoreIndex = INDEX["rag_index"]
-    query_engine: BaseQueryEngine = index.as_query_engine(streaming=True, llm=llm)
-    response = query_engine.query(chat_input.user_message)
-    return StreamingResponse(response.response_gen, media_type="text/event-stream")
+    # time to first token includes query embedding and retrieval, as the user experiences it
+    call_metrics = LLMCallMetrics(model=settings.llm.MODEL, endpoint="rag_stream")
+    registry: QueryEngineRegistry = INDEX["query_engines"]
+    query_engine: BaseQueryEngine = registry.get()
+    try:
+        # the query is embedded off the event loop, batched with concurrent queries; the retriever reuses the embedding
+        embedding = await INDEX["query_embedder"].embed(chat_input.user_message)
+        query_bundle = QueryBundle(query_str=chat_input.user_message, embedding=embedding)
+        response: AsyncStreamingResponse = await query_engine.aquery(query_bundle)
+    except asyncio.CancelledError:
+        call_metrics.finish(status="cancelled")
+        raise
+    except Exception:
+        call_metrics.finish(status="error")
+        raise
+    return StreamingResponse(track_tokens(response.async_response_gen(), call_metrics), media_type="text/event-stream")
+
+@api_router.get("/metrics", status_code=200)
+async def metrics() -> Response:
+    """
+    Exposes time to first token, inter-token latency, token counts and tokens per second of every LLM call in the
+    Prometheus text format.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+    return metrics_response()
 
 @api_router.get("/chatbot", status_code=200)
 async def ui(request: Request) -> Any:
@@ -0,0 +1,41 @@
+from typing import AsyncGenerator
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+# the metric definitions are shared with the part 2 llama.cpp scripts, so every process reports the same series
+from shared.llm_metrics import LLMCallMetrics  # noqa: F401 (re-exported)
+
+
+async def track_tokens(tokens: AsyncGenerator[str, None], metrics: LLMCallMetrics) -> AsyncGenerator[str, None]:
+    """
+    Relays a stream of generated tokens, recording each one, and finishes the call's metrics when it ends.
+
+    Args:
+        tokens (AsyncGenerator[str, None]): The generated tokens.
+        metrics (LLMCallMetrics): The metrics of the call producing the tokens.
+
+    Yields:
+        str: The tokens, unchanged.
+    """
+    status = "cancelled"
+    try:
+        async for token in tokens:
+            metrics.token()
+            yield token
+        status = "ok"
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        metrics.finish(status=status)
+
+
+def metrics_response() -> Response:
+    """
+    Renders every metric in the Prometheus text exposition format.
+
+    Returns:
+        Response: The metrics, for a /metrics endpoint.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,6 +1,7 @@
 from app.db.base_class import Base
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 
 
 class Podcast(Base):
@@ -11,17 +12,21 @@ class Podcast(Base):
 
 class Episode(Base):
     __tablename__ = 'episode'
+    # the key episodes are upserted on
+    __table_args__ = (UniqueConstraint('podcast_id', 'title', name='uq_episode_podcast_id_title'),)
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
     url = Column(String(512))
     podcast_id = Column(Integer, ForeignKey('podcast.id'), nullable=False)
     podcast = relationship("Podcast", back_populates="episodes")
     summary = relationship("Summary", back_populates="episode", uselist=False)
-    transcript = Column(Text, nullable=True)
+    # transcripts run to hundreds of KB: left out of episode queries unless undeferred, and never lazy-loaded
+    transcript = deferred(Column(Text, nullable=True), raiseload=True)
 
 class Summary(Base):
     __tablename__ = 'summary'
     id = Column(Integer, primary_key=True)
-    content = Column(Text, nullable=True)
+    # decoded once by the driver; JSON1 text on SQLite, binary JSONB on Postgres
+    content = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     episode_id = Column(Integer, ForeignKey('episode.id'), unique=True)
     episode = relationship("Episode", back_populates="summary")
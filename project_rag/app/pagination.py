@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encodes the key of the last row of a page as an opaque cursor for the next page.
+
+    Clients pass the cursor back unchanged, so the key it holds (the id today, a published date and id later) can
+    change without breaking them.
+
+    Args:
+        last_id (int): The id of the last row on the page.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodes a cursor made by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor from the previous page.
+
+    Returns:
+        int: The id of the last row of the previous page.
+
+    Raises:
+        ValueError: If the cursor was not made by `encode_cursor` or does not hold an integer id.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(payload)["id"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    # the id reaches SQL as a bind parameter, so anything but an integer is rejected here (bool is an int subclass)
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return last_id
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.embeddings.huggingface.utils import format_query
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingBatcher:
+    """
+    Embeds RAG queries off the event loop, coalescing concurrent queries into batched forward passes.
+
+    Queries that arrive within `max_wait_ms` of each other (up to `max_batch_size` of them) are embedded
+    together in one forward pass on a dedicated worker thread, so the event loop never blocks on the model
+    and a CPU-only node pays the per-pass overhead once per batch rather than once per query. Recently seen
+    queries are answered from an LRU cache without touching the model.
+
+    Attributes:
+        embed_model (HuggingFaceEmbedding): The model used to embed queries.
+        max_batch_size (int): The largest number of queries embedded in one forward pass.
+        max_wait_ms (float): How long the first query of a batch waits for others to join it.
+        cache_size (int): The number of query embeddings kept in the LRU cache.
+    """
+
+    def __init__(
+        self,
+        embed_model: HuggingFaceEmbedding,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5,
+        cache_size: int = 1024,
+    ) -> None:
+        self.embed_model = embed_model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, List[float]] = OrderedDict()
+        self._queue: asyncio.Queue[Tuple[str, asyncio.Future]] = asyncio.Queue()
+        # A single thread: torch already parallelises one forward pass over every core
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embedder")
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Starts the background task that drains the queue into batches.
+        """
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background task and fails any query still waiting for an embedding.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Query embedder stopped"))
+        self._executor.shutdown(wait=False)
+
+    async def embed(self, query: str) -> List[float]:
+        """
+        Returns the embedding of a query, from the cache or from the next batched forward pass.
+
+        Args:
+            query (str): The user's question.
+
+        Returns:
+            List[float]: The query embedding.
+        """
+        embedding = self._cache.get(query)
+        if embedding is not None:
+            self._cache.move_to_end(query)
+            return embedding
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # identical questions in the same batch are only embedded once, and questions answered by an
+            # earlier batch while this one was queued are served from the cache
+            waiters: Dict[str, List[asyncio.Future]] = {}
+            for query, future in batch:
+                if query in self._cache:
+                    if not future.done():
+                        future.set_result(self._cache[query])
+                    continue
+                waiters.setdefault(query, []).append(future)
+            queries = list(waiters)
+            if not queries:
+                continue
+
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self._embed_batch, queries)
+            except Exception as e:
+                logger.exception("Query embedding batch failed")
+                for futures in waiters.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+
+            for query, embedding in zip(queries, embeddings):
+                self._remember(query, embedding)
+                for future in waiters[query]:
+                    if not future.done():
+                        future.set_result(embedding)
+
+    def _embed_batch(self, queries: List[str]) -> List[List[float]]:
+        # Apply the model's query instruction (if any) as _get_query_embedding does, then embed the whole batch in
+        # one pass. _embed is the model's raw forward pass: the public text path would add the text instruction too.
+        formatted = [
+            format_query(query, self.embed_model.model_name, self.embed_model.query_instruction)
+            for query in queries
+        ]
+        return self.embed_model._embed(formatted)
+
+    def _remember(self, query: str, embedding: List[float]) -> None:
+        self._cache[query] = embedding
+        self._cache.move_to_end(query)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -1,4 +1,6 @@
 # app/schemas/podcast.py
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel
 
 class PodcastBase(BaseModel):
@@ -39,8 +41,12 @@ class EpisodeInDBBase(EpisodeBase):
 class Episode(EpisodeInDBBase):
     pass
 
+class EpisodePage(BaseModel):
+    items: List[Episode]
+    next_cursor: Optional[str] = None  # None on the last page
+
 class SummaryBase(BaseModel):
-    content: str
+    content: Dict[str, Any]
     episode_id: int
 
 class SummaryCreate(SummaryBase):
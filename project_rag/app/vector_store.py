@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import fsspec
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+logger = logging.getLogger(__name__)
+
+# Mirrors the "<namespace>__vector_store.json" path that StorageContext.persist hands to every vector store
+DEFAULT_PERSIST_STEM: str = "default__vector_store"
+EMBEDDINGS_SUFFIX: str = ".npy"
+IDS_SUFFIX: str = ".ids.json"
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    A vector store that keeps every embedding in one contiguous float32 matrix.
+
+    Unlike `SimpleVectorStore`, which persists embeddings as JSON lists and scores them one by one in Python,
+    the matrix is persisted as a `.npy` file that is memory-mapped on load, and queries are scored with a single
+    matrix-vector product. Node and ref doc ids are persisted alongside it in a small JSON table.
+
+    Embeddings are L2-normalised when they are added, so cosine similarity is a plain dot product. As with
+    `SimpleVectorStore` the node text lives in the docstore (`stores_text` is False). Metadata filters are not
+    supported.
+    """
+
+    stores_text: bool = False
+
+    _embeddings: np.ndarray = PrivateAttr()
+    _node_ids: List[str] = PrivateAttr()
+    _ref_doc_ids: List[str] = PrivateAttr()
+    _row_by_node_id: Dict[str, int] = PrivateAttr()
+    _node_filter_cache: Optional[Tuple[Sequence[str], np.ndarray]] = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        embeddings: Optional[np.ndarray] = None,
+        node_ids: Optional[List[str]] = None,
+        ref_doc_ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._embeddings = embeddings if embeddings is not None else np.empty((0, 0), dtype=np.float32)
+        self._node_ids = node_ids or []
+        self._ref_doc_ids = ref_doc_ids or []
+        self._row_by_node_id = {node_id: row for row, node_id in enumerate(self._node_ids)}
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> None:
+        return None
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """
+        The (n_nodes, embed_dim) float32 matrix of normalised embeddings, possibly memory-mapped.
+        """
+        return self._embeddings
+
+    def get(self, node_id: str) -> List[float]:
+        """
+        Returns the (normalised) embedding stored for a node.
+
+        Args:
+            node_id (str): The id of the node.
+
+        Returns:
+            List[float]: The node embedding.
+        """
+        return self._embeddings[self._row_by_node_id[node_id]].tolist()
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """
+        Appends the embeddings of the given nodes to the matrix.
+
+        Args:
+            nodes (List[BaseNode]): Nodes with their embeddings populated.
+
+        Returns:
+            List[str]: The ids of the added nodes.
+        """
+        if not nodes:
+            return []
+
+        new_embeddings = _normalise(np.asarray([node.get_embedding() for node in nodes], dtype=np.float32))
+        if self._embeddings.size:
+            # np.concatenate copies, so a read-only memory-mapped matrix becomes an in-memory one here
+            self._embeddings = np.concatenate([self._embeddings, new_embeddings])
+        else:
+            self._embeddings = new_embeddings
+
+        for node in nodes:
+            self._row_by_node_id[node.node_id] = len(self._node_ids)
+            self._node_ids.append(node.node_id)
+            self._ref_doc_ids.append(node.ref_doc_id or "None")
+        self._node_filter_cache = None
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """
+        Deletes every node that belongs to the given source document.
+
+        Args:
+            ref_doc_id (str): The doc_id of the document to delete.
+        """
+        self._drop_rows([row for row, ref_doc_id_ in enumerate(self._ref_doc_ids) if ref_doc_id_ == ref_doc_id])
+
+    def delete_nodes(
+        self,
+        node_ids: Optional[List[str]] = None,
+        filters: Optional[MetadataFilters] = None,
+        **delete_kwargs: Any,
+    ) -> None:
+        """
+        Deletes the given nodes.
+
+        Args:
+            node_ids (Optional[List[str]]): The ids of the nodes to delete.
+            filters (Optional[MetadataFilters]): Not supported, must be None.
+        """
+        if filters is not None:
+            raise ValueError("NumpyVectorStore does not support metadata filters.")
+        if node_ids is None:
+            return
+        self._drop_rows([self._row_by_node_id[node_id] for node_id in node_ids if node_id in self._row_by_node_id])
+
+    def clear(self) -> None:
+        """
+        Removes every node from the store.
+        """
+        self._embeddings = np.empty((0, 0), dtype=np.float32)
+        self._node_ids = []
+        self._ref_doc_ids = []
+        self._row_by_node_id = {}
+        self._node_filter_cache = None
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """
+        Returns the nodes most similar to the query embedding.
+
+        Args:
+            query (VectorStoreQuery): The query, with `query_embedding` populated.
+
+        Returns:
+            VectorStoreQueryResult: The ids and cosine similarities of the top-k nodes.
+        """
+        return self.batch_query([query])[0]
+
+    def batch_query(self, queries: List[VectorStoreQuery]) -> List[VectorStoreQueryResult]:
+        """
+        Scores several queries against the whole matrix with one matrix product.
+
+        Args:
+            queries (List[VectorStoreQuery]): Queries with `query_embedding` populated. Queries may restrict
+                the candidates with `node_ids` but must not use metadata filters.
+
+        Returns:
+            List[VectorStoreQueryResult]: One result per query, in the same order.
+        """
+        for query in queries:
+            if query.filters is not None:
+                raise ValueError("NumpyVectorStore does not support metadata filters.")
+            if query.mode != VectorStoreQueryMode.DEFAULT:
+                raise ValueError(f"Invalid query mode: {query.mode}")
+
+        if not queries:
+            return []
+        if not self._node_ids:
+            return [VectorStoreQueryResult(similarities=[], ids=[]) for _ in queries]
+
+        query_matrix = _normalise(np.asarray([query.query_embedding for query in queries], dtype=np.float32))
+        # (n_queries, n_nodes) cosine similarities
+        scores = query_matrix @ self._embeddings.T
+
+        results = []
+        for query, query_scores in zip(queries, scores):
+            candidate_rows = self._candidate_rows(query.node_ids)
+            if candidate_rows is not None:
+                query_scores = query_scores[candidate_rows]
+            top_k = min(query.similarity_top_k, len(query_scores))
+            if top_k == 0:
+                results.append(VectorStoreQueryResult(similarities=[], ids=[]))
+                continue
+            top = np.argpartition(-query_scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-query_scores[top])]
+            rows = candidate_rows[top] if candidate_rows is not None else top
+            results.append(
+                VectorStoreQueryResult(
+                    similarities=query_scores[top].tolist(),
+                    ids=[self._node_ids[row] for row in rows],
+                )
+            )
+        return results
+
+    def persist(self, persist_path: str, fs: Optional[fsspec.AbstractFileSystem] = None) -> None:
+        """
+        Writes the embedding matrix and the id table next to the given path.
+
+        `persist_path` is the JSON path `StorageContext.persist` reserves for the vector store, e.g.
+        `index_store/default__vector_store.json`; the matrix is written to `default__vector_store.npy` and the id
+        table to `default__vector_store.ids.json`. Both are written to temporary files and renamed into place so
+        a process that has the previous matrix memory-mapped is unaffected.
+
+        Args:
+            persist_path (str): The vector store path chosen by the storage context.
+            fs (Optional[fsspec.AbstractFileSystem]): Ignored, only the local filesystem is supported.
+        """
+        embeddings_path, ids_path = _persist_paths(persist_path)
+        embeddings_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_embeddings_path = embeddings_path.with_name(embeddings_path.name + ".tmp")
+        with open(tmp_embeddings_path, "wb") as handler:
+            np.save(handler, np.ascontiguousarray(self._embeddings, dtype=np.float32))
+        tmp_ids_path = ids_path.with_name(ids_path.name + ".tmp")
+        with open(tmp_ids_path, "w") as handler:
+            json.dump({"node_ids": self._node_ids, "ref_doc_ids": self._ref_doc_ids}, handler)
+
+        os.replace(tmp_embeddings_path, embeddings_path)
+        os.replace(tmp_ids_path, ids_path)
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: Path | str, mmap: bool = True) -> "NumpyVectorStore":
+        """
+        Loads the store persisted in a directory.
+
+        Indexes persisted before this store existed only contain a `SimpleVectorStore` JSON file; those are
+        converted on the fly, and will be written in the NumPy format the next time the index is persisted.
+
+        Args:
+            persist_dir (Path | str): The index directory.
+            mmap (bool): Memory-map the embedding matrix instead of reading it into memory.
+
+        Returns:
+            NumpyVectorStore: The loaded vector store.
+        """
+        embeddings_path, ids_path = _persist_paths(Path(persist_dir) / f"{DEFAULT_PERSIST_STEM}.json")
+        if not embeddings_path.exists():
+            simple_store_path = Path(persist_dir) / f"{DEFAULT_PERSIST_STEM}.json"
+            if simple_store_path.exists():
+                logger.info(f"Converting SimpleVectorStore at {simple_store_path}")
+                return cls.from_simple_vector_store(SimpleVectorStore.from_persist_path(str(simple_store_path)))
+            raise ValueError(f"No NumpyVectorStore found at {embeddings_path}")
+
+        embeddings = np.load(embeddings_path, mmap_mode="r" if mmap else None)
+        with open(ids_path, "r") as handler:
+            ids = json.load(handler)
+        return cls(embeddings=embeddings, node_ids=ids["node_ids"], ref_doc_ids=ids["ref_doc_ids"])
+
+    @classmethod
+    def from_simple_vector_store(cls, simple_store: SimpleVectorStore) -> "NumpyVectorStore":
+        """
+        Builds a NumpyVectorStore holding the same embeddings as a SimpleVectorStore.
+
+        Args:
+            simple_store (SimpleVectorStore): The store to convert.
+
+        Returns:
+            NumpyVectorStore: The converted vector store.
+        """
+        embedding_dict = simple_store.data.embedding_dict
+        node_ids = list(embedding_dict)
+        if not node_ids:
+            return cls()
+        return cls(
+            embeddings=_normalise(np.asarray([embedding_dict[node_id] for node_id in node_ids], dtype=np.float32)),
+            node_ids=node_ids,
+            ref_doc_ids=[simple_store.data.text_id_to_ref_doc_id.get(node_id, "None") for node_id in node_ids],
+        )
+
+    def _candidate_rows(self, node_ids: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        """
+        Translates a query's node id restriction into matrix rows, or None when every row is a candidate.
+
+        The retriever passes the same node id list on every query, so the last translation is cached.
+        """
+        if node_ids is None:
+            return None
+        cached = self._node_filter_cache
+        if cached is not None and cached[0] is node_ids:
+            return cached[1]
+
+        rows = np.fromiter(
+            (self._row_by_node_id[node_id] for node_id in node_ids if node_id in self._row_by_node_id),
+            dtype=np.int64,
+        )
+        candidate_rows = None if len(rows) == len(self._node_ids) else np.sort(rows)
+        self._node_filter_cache = (node_ids, candidate_rows)
+        return candidate_rows
+
+    def _drop_rows(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        keep = np.ones(len(self._node_ids), dtype=bool)
+        keep[rows] = False
+        self._embeddings = self._embeddings[keep]
+        self._node_ids = [node_id for node_id, kept in zip(self._node_ids, keep) if kept]
+        self._ref_doc_ids = [ref_doc_id for ref_doc_id, kept in zip(self._ref_doc_ids, keep) if kept]
+        self._row_by_node_id = {node_id: row for row, node_id in enumerate(self._node_ids)}
+        self._node_filter_cache = None
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _persist_paths(persist_path: Path | str) -> Tuple[Path, Path]:
+    stem = Path(persist_path).with_suffix("")
+    return stem.with_name(stem.name + EMBEDDINGS_SUFFIX), stem.with_name(stem.name + IDS_SUFFIX)
@@ -0,0 +1,123 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+from shared.embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker, so the model is loaded once per worker rather than once per batch
+_WORKER_MODEL: HuggingFaceEmbedding | None = None
+
+
+def _init_worker(model_name: str, batch_size: int, torch_threads: int) -> None:
+    """
+    Loads a copy of the embedding model into a pool worker.
+
+    Args:
+        model_name (str): The HuggingFace model to load.
+        batch_size (int): The batch size the model embeds with.
+        torch_threads (int): The number of intra-op threads torch may use in this worker.
+    """
+    global _WORKER_MODEL
+    import torch
+
+    # Without this every worker would spawn one thread per core and the pool would thrash the CPU
+    torch.set_num_threads(torch_threads)
+    _WORKER_MODEL = HuggingFaceEmbedding(model_name=model_name, embed_batch_size=batch_size)
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    return _WORKER_MODEL.get_text_embedding_batch(texts)
+
+
+def make_batches(texts: Sequence[str], batch_size: int) -> List[List[int]]:
+    """
+    Groups text positions into batches of similar length.
+
+    Every text in a batch is padded to the longest one, so sorting by length before batching keeps the
+    amount of padding (and wasted compute) small.
+
+    Args:
+        texts (Sequence[str]): The texts to embed.
+        batch_size (int): The maximum number of texts per batch.
+
+    Returns:
+        List[List[int]]: Batches of positions into `texts`.
+    """
+    order = sorted(range(len(texts)), key=lambda position: len(texts[position]))
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def embed_nodes(
+    nodes: Sequence[BaseNode],
+    embed_model: HuggingFaceEmbedding,
+    batch_size: int,
+    num_workers: int,
+    cache: EmbeddingCache | None = None,
+) -> float:
+    """
+    Embeds the nodes in place, in length-sorted batches, across a pool of worker processes.
+
+    With a single worker the batches are embedded in this process with `embed_model`. With more, each worker
+    loads its own copy of the model and the cores are split evenly between them. When a cache is given, chunks
+    it already holds for this model are not embedded again, and new embeddings are added to it.
+
+    Args:
+        nodes (Sequence[BaseNode]): The nodes to embed; their `embedding` attribute is set.
+        embed_model (HuggingFaceEmbedding): The embedding model; its name is used to load the worker copies.
+        batch_size (int): The number of chunks embedded per forward pass.
+        num_workers (int): The number of worker processes.
+        cache (EmbeddingCache | None): The persistent embedding cache to consult and fill.
+
+    Returns:
+        float: The throughput in chunks per second.
+    """
+    if cache is not None:
+        all_texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        cached_embeddings = cache.get_many(embed_model.model_name, all_texts)
+        for node, embedding in zip(nodes, cached_embeddings):
+            node.embedding = embedding
+        logger.info(f"Embedding cache hits: {len(nodes) - cached_embeddings.count(None)}/{len(nodes)} chunks")
+        nodes = [node for node in nodes if node.embedding is None]
+
+    if not nodes:
+        return 0.0
+
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    batches = make_batches(texts, batch_size)
+    batch_texts = [[texts[position] for position in batch] for batch in batches]
+
+    start = time.perf_counter()
+    if num_workers <= 1:
+        batch_embeddings = [embed_model.get_text_embedding_batch(texts_) for texts_ in batch_texts]
+    else:
+        torch_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        # spawn rather than fork, torch is not fork-safe once its thread pool has started
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(embed_model.model_name, batch_size, torch_threads),
+        ) as executor:
+            batch_embeddings = list(executor.map(_embed_batch, batch_texts))
+    elapsed = time.perf_counter() - start
+
+    for batch, embeddings in zip(batches, batch_embeddings):
+        for position, embedding in zip(batch, embeddings):
+            nodes[position].embedding = embedding
+    if cache is not None:
+        cache.put_many(embed_model.model_name, texts, [node.embedding for node in nodes])
+
+    throughput = len(nodes) / elapsed if elapsed else float("inf")
+    logger.info(
+        f"Embedded {len(nodes)} chunks in {elapsed:.1f}s with {num_workers} worker(s), "
+        f"batch size {batch_size}: {throughput:.1f} chunks/sec"
+    )
+    return throughput
@@ -1,18 +1,32 @@
-import glob
+import argparse
+import json
+import logging
+import os
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List
 
 from llama_index.core import (
+    Settings,
     SimpleDirectoryReader,
     VectorStoreIndex,
     StorageContext,
     load_index_from_storage,
 )
+from llama_index.core.ingestion import run_transformations
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from app.config import TRANSCRIPT_DIR
+from app.config import TRANSCRIPT_DIR, settings
+from app.vector_store import NumpyVectorStore
+from embedding_pipeline import embed_nodes
+from shared.embedding_cache import EmbeddingCache
+from shared.file_utils import sha256_of_file
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 BASE_DIR: Path = Path(__file__).resolve().parent.parent
 INDEX_DIR: Path = BASE_DIR / "app" / "index_store"
+MANIFEST_FILE_NAME: str = "transcript_manifest.json"
 
 def load_embedding_model() -> HuggingFaceEmbedding:
     """
@@ -21,40 +35,159 @@ def load_embedding_model() -> HuggingFaceEmbedding:
     Returns:
         HuggingFaceEmbedding: The loaded embedding model instance.
     """
-    return HuggingFaceEmbedding(model_name="WhereIsAI/UAE-Large-V1")
+    return HuggingFaceEmbedding(model_name=settings.embedding.MODEL_NAME, embed_batch_size=settings.embedding.BATCH_SIZE)
 
-def generate_rag_index(index_dir: Path, embed_model: HuggingFaceEmbedding) -> VectorStoreIndex:
+def load_manifest(index_dir: Path) -> Dict[str, Dict[str, Any]] | None:
     """
-    Generates or loads a VectorStoreIndex from the specified index directory using the provided embedding model.
-    If an index already exists in the directory, it is loaded; otherwise, a new index is created from transcripts.
+    Loads the transcript manifest, which maps each indexed transcript file name to its content hash and the ids
+    of the documents it produced.
 
     Args:
-        index_dir (Path): The directory where the index is stored or will be stored.
+        index_dir (Path): The directory where the index is stored.
+
+    Returns:
+        Dict[str, Dict[str, Any]] | None: The manifest, or None if the index has no manifest yet.
+    """
+    manifest_path = index_dir / MANIFEST_FILE_NAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r") as file:
+        return json.load(file)
+
+def write_manifest(index_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Writes the transcript manifest next to the persisted index, atomically: a crash leaves the previous manifest
+    in place rather than a truncated one.
+
+    Args:
+        index_dir (Path): The directory where the index is stored.
+        manifest (Dict[str, Dict[str, Any]]): The manifest to write.
+    """
+    manifest_path = index_dir / MANIFEST_FILE_NAME
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, manifest_path)
+
+def load_or_create_index(index_dir: Path, embed_model: HuggingFaceEmbedding) -> VectorStoreIndex:
+    """
+    Loads the index persisted in the index directory, or creates an empty one if nothing has been persisted yet.
+
+    Args:
+        index_dir (Path): The directory where the index is stored.
         embed_model (HuggingFaceEmbedding): The embedding model to use for document encoding.
 
     Returns:
-        VectorStoreIndex: The generated or loaded vector store index.
+        VectorStoreIndex: The loaded or empty index.
     """
-    index_exists = any(item for item in index_dir.iterdir() if item.name != ".gitkeep")
-    if index_exists:
-        storage_context = StorageContext.from_defaults(persist_dir=str(index_dir))
+    if (index_dir / "index_store.json").exists():
+        vector_store = NumpyVectorStore.from_persist_dir(index_dir)
+        storage_context = StorageContext.from_defaults(persist_dir=str(index_dir), vector_store=vector_store)
         return load_index_from_storage(storage_context=storage_context, embed_model=embed_model)
 
-    transcript_files: List[str] = glob.glob(str(TRANSCRIPT_DIR / "*.txt"))
-    # Filter out files from the test_data subdirectory
-    transcript_files = [_file for _file in transcript_files]
-    documents = SimpleDirectoryReader(input_files=transcript_files, exclude=["test_data/"]).load_data()
+    storage_context = StorageContext.from_defaults(vector_store=NumpyVectorStore())
+    return VectorStoreIndex(nodes=[], storage_context=storage_context, embed_model=embed_model)
+
+def generate_rag_index(
+    index_dir: Path,
+    embed_model: HuggingFaceEmbedding,
+    batch_size: int = settings.embedding.BATCH_SIZE,
+    num_workers: int = settings.embedding.NUM_WORKERS,
+    cache: EmbeddingCache | None = None,
+) -> VectorStoreIndex:
+    """
+    Brings the VectorStoreIndex in the specified index directory up to date with the transcripts in TRANSCRIPT_DIR.
+
+    A manifest of transcript content hashes is kept next to the index, so only new or changed transcripts are
+    embedded, and the nodes of removed or changed transcripts are deleted. If nothing changed, the persisted index
+    is loaded and returned untouched. Chunks are embedded by `embedding_pipeline.embed_nodes` in length-sorted
+    batches, optionally across several worker processes, and chunks found in the embedding cache are not
+    embedded again.
+
+    Args:
+        index_dir (Path): The directory where the index is stored or will be stored.
+        embed_model (HuggingFaceEmbedding): The embedding model to use for document encoding.
+        batch_size (int): The number of chunks embedded per forward pass.
+        num_workers (int): The number of embedding worker processes.
+        cache (EmbeddingCache | None): The persistent embedding cache, keyed by chunk content.
+
+    Returns:
+        VectorStoreIndex: The up-to-date vector store index.
+    """
+    index = load_or_create_index(index_dir=index_dir, embed_model=embed_model)
+    manifest = load_manifest(index_dir)
+    if manifest is None:
+        if index.ref_doc_info:
+            # Indexes built before the manifest existed cannot be diffed, so they are rebuilt once
+            logger.warning("Index has no transcript manifest, re-indexing every transcript")
+            for ref_doc_id in list(index.ref_doc_info):
+                index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
+        manifest = {}
+
+    transcript_hashes: Dict[str, str] = {
+        path.name: sha256_of_file(path) for path in sorted(TRANSCRIPT_DIR.glob("*.txt"))
+    }
+    removed: List[str] = sorted(set(manifest) - set(transcript_hashes))
+    changed: List[str] = [name for name in manifest if name in transcript_hashes and manifest[name]["sha256"] != transcript_hashes[name]]
+    added: List[str] = sorted(set(transcript_hashes) - set(manifest))
+
+    if not (removed or changed or added):
+        logger.info("Index is up to date")
+        return index
+    logger.info(f"Transcripts added: {len(added)}, changed: {len(changed)}, removed: {len(removed)}")
+
+    for file_name in removed + changed:
+        for ref_doc_id in manifest.pop(file_name)["ref_doc_ids"]:
+            index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
+
+    to_embed = sorted(changed + added)
+    if to_embed:
+        documents = SimpleDirectoryReader(input_files=[TRANSCRIPT_DIR / name for name in to_embed]).load_data()
+        ref_doc_ids: Dict[str, List[str]] = {name: [] for name in to_embed}
+        for document in documents:
+            file_name = document.metadata["file_name"]
+            # Stable ids, so the manifest can find the documents again on the next run
+            document.id_ = f"{file_name}_part_{len(ref_doc_ids[file_name])}"
+            ref_doc_ids[file_name].append(document.id_)
+            # a run that crashed after persisting the index but before writing the manifest already inserted
+            # this document: drop that copy, or retrieval would return its chunks twice
+            if document.id_ in index.ref_doc_info:
+                index.delete_ref_doc(document.id_, delete_from_docstore=True)
+
+        nodes = run_transformations(documents, Settings.transformations, show_progress=True)
+        embed_nodes(nodes, embed_model=embed_model, batch_size=batch_size, num_workers=num_workers, cache=cache)
+        # the nodes already carry embeddings, so the index does not embed them again
+        index.insert_nodes(nodes)
+        for document in documents:
+            index.docstore.set_document_hash(document.get_doc_id(), document.hash)
+        for file_name in to_embed:
+            manifest[file_name] = {"sha256": transcript_hashes[file_name], "ref_doc_ids": ref_doc_ids[file_name]}
 
-    index: VectorStoreIndex = VectorStoreIndex.from_documents(documents, embed_model=embed_model, show_progress=True)
     index.storage_context.persist(persist_dir=index_dir)
+    write_manifest(index_dir, manifest)
     return index
 
 def main():
     """
-    Main function to load the embedding model and generate or load the RAG index.
+    Main function to load the embedding model and generate or update the RAG index.
     """
+    parser = argparse.ArgumentParser(description='Generate or update the RAG index.')
+    parser.add_argument('--batch-size', '-b', type=int, default=settings.embedding.BATCH_SIZE, help='chunks per embedding batch')
+    parser.add_argument('--workers', '-w', type=int, default=settings.embedding.NUM_WORKERS, help='embedding worker processes')
+    parser.add_argument('--no-cache', action='store_true', help='ignore the on-disk embedding cache')
+    args = parser.parse_args()
+
     embedding_model: HuggingFaceEmbedding = load_embedding_model()
-    generate_rag_index(embed_model=embedding_model, index_dir=INDEX_DIR)
+    cache = None if args.no_cache else EmbeddingCache(settings.embedding.CACHE_PATH)
+    generate_rag_index(
+        embed_model=embedding_model,
+        index_dir=INDEX_DIR,
+        batch_size=args.batch_size,
+        num_workers=args.workers,
+        cache=cache,
+    )
 
 if __name__ == "__main__":
     main()
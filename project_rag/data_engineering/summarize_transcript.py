@@ -1,8 +1,14 @@
 import json
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Dict, Iterator, List, Tuple
 import argparse
+import glob
+import hashlib
 import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 from llama_cpp import (
     Llama,
@@ -13,13 +19,59 @@ from llama_cpp import (
 
 from app.config import MODEL_DIR, PROMPT_DIR, TRANSCRIPT_DIR, SUMMARY_DIR
 from app.config import settings
+from shared.file_utils import sha256_of_file
+from shared.grammar import GRAMMARS
+from shared.json_stream import JSONObjectStream
+from shared.prompt_cache import attach_prompt_cache, prompt_cache_path, prompt_eval_timings, reset_timings
+from shared.summarization import (
+    CHUNK_SYSTEM_PROMPT,
+    chat_messages,
+    check_progress,
+    chunk_by_tokens,
+    combine_notes,
+    summarize_chunk,
+    token_counter,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT_FILE_NAME: str = "summarize_podcast_transcript.md.j2"
+MANIFEST_FILE_NAME: str = "summary_manifest.json"
+PROMPT_TEMPLATE_TOKENS: int = 64  # allowance for the chat template's role markers
+# Compiled to a grammar once per process by the grammar registry
+SUMMARY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {
+            "type": "string",
+            "minLength": 200,
+            "maxLength": 300,
+            "description": "A brief summary of the interview content."
+        },
+        "quote": {
+            "type": "string",
+            "description": "A quote from the interview subject that captures a key theme of the podcast."
+        },
+        "interview_date": {
+            "type": "string",
+            "format": "date",
+            "description": "The date when the interview was conducted."
+        }
+    },
+    "required": [
+        "summary",
+        "interview_date",
+    ]
+}
+
+# Set in each worker process by _init_worker, so the model is loaded once per worker rather than once per transcript
+_WORKER_LLM: Llama | None = None
+_WORKER_SYSTEM_PROMPT: str | None = None
+
 def load_system_prompt() -> str:
-    with open(PROMPT_DIR / "summarize_podcast_transcript.md.j2", "r") as file:
+    with open(PROMPT_DIR / SYSTEM_PROMPT_FILE_NAME, "r") as file:
         return file.read()
 
 def prepare_user_prompt(transcript_path: Path) -> str:
@@ -27,12 +79,13 @@ def prepare_user_prompt(transcript_path: Path) -> str:
         transcript = file.read()
     return transcript
 
-def load_model(model_path: Path) -> Llama:
+def load_model(model_path: Path, n_threads: int | None = None, n_ctx: int = settings.llm.CONTEXT_WINDOW) -> Llama:
     return Llama(
         model_path=str(model_path),
-        n_ctx=settings.llm.CONTEXT_WINDOW,
+        n_ctx=n_ctx,
         n_gpu_layers=settings.llm.N_GPU_LAYERS,
-        chat_format=settings.llm.CHAT_FORMAT
+        chat_format=settings.llm.CHAT_FORMAT,
+        n_threads=n_threads,
     )
 
 def prepare_output(
@@ -41,43 +94,106 @@ def prepare_output(
     system_prompt: str
 ) -> CreateChatCompletionResponse | Iterator[CreateChatCompletionStreamResponse]:
     result = llm.create_chat_completion(
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+        messages=chat_messages(llm, system_prompt, user_prompt),
         max_tokens=settings.llm.MAX_TOKENS,
         stop=[],
         temperature=settings.llm.TEMPERATURE,
-        response_format={
-            "type": "json_object",
-            "schema": {
-              "type": "object",
-              "properties": {
-                "summary": {
-                  "type": "string",
-                  "minLength": 200,
-                  "maxLength": 300,
-                  "description": "A brief summary of the interview content."
-                },
-                "quote": {
-                  "type": "string",
-                  "description": "A quote from the interview subject that captures a key theme of the podcast."
-                },
-                "interview_date": {
-                  "type": "string",
-                  "format": "date",
-                  "description": "The date when the interview was conducted."
-                }
-              },
-              "required": [
-                "summary",
-                "interview_date",
-              ]
-            }
-        }
+        grammar=GRAMMARS.from_json_schema(SUMMARY_SCHEMA),
     )
     return result['choices'][0]['message']['content']
 
+def prompt_fingerprint(llm: Llama, system_prompt: str, user_prompt: str) -> Dict[str, str]:
+    prompt = f"{system_prompt}\0{user_prompt}".encode("utf-8")
+    return {"prompt_sha256": hashlib.sha256(prompt).hexdigest(), "model": Path(llm.model_path).name}
+
+def load_partial_fields(partial_path: Path, fingerprint: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Recovers the fields an interrupted streamed summary had completed.
+
+    A partial file is a JSON header line (the prompt fingerprint and any fields kept from earlier attempts) followed
+    by the text streamed so far. It is ignored if it was generated from a different prompt or model.
+
+    Args:
+        partial_path (Path): The partial summary file.
+        fingerprint (Dict[str, str]): The fingerprint of the prompt about to be summarized.
+
+    Returns:
+        Dict[str, Any]: The completed summary fields, empty if there is nothing to resume.
+    """
+    if not partial_path.exists():
+        return {}
+    with open(partial_path, "r", encoding="utf-8") as file:
+        header_line = file.readline()
+        streamed = file.read()
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        return {}
+    if header.get("fingerprint") != fingerprint:
+        return {}
+    stream = JSONObjectStream()
+    stream.feed(streamed)
+    return {**header.get("fields", {}), **stream.fields}
+
+def remaining_schema(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **SUMMARY_SCHEMA,
+        "properties": {key: value for key, value in SUMMARY_SCHEMA["properties"].items() if key not in fields},
+        "required": [key for key in SUMMARY_SCHEMA["required"] if key not in fields],
+    }
+
+def stream_output(llm: Llama, user_prompt: str, system_prompt: str, partial_path: Path) -> str:
+    """
+    Generates a summary token by token, appending the tokens to a partial file as they arrive and logging each field
+    as soon as its value closes.
+
+    If an earlier attempt at the same prompt was interrupted, the fields it completed are kept and only the missing
+    ones are generated, constrained by a grammar for the remaining properties. A field that was still being written
+    is generated again.
+
+    Args:
+        llm (Llama): The model.
+        user_prompt (str): The transcript (or the notes on it).
+        system_prompt (str): The summarization system prompt.
+        partial_path (Path): The file the summary is streamed to.
+
+    Returns:
+        str: The summary JSON, with its fields in schema order.
+
+    Raises:
+        ValueError: If generation stopped before the JSON object was complete; the partial file is kept for a resume.
+    """
+    fingerprint = prompt_fingerprint(llm, system_prompt, user_prompt)
+    fields = load_partial_fields(partial_path, fingerprint)
+    if fields:
+        logger.info(f"{partial_path.name}: resuming with {', '.join(fields)} already generated")
+    schema = remaining_schema(fields)
+    if schema["properties"]:
+        stream = JSONObjectStream()
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(partial_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"fingerprint": fingerprint, "fields": fields}) + "\n")
+            chunks = llm.create_chat_completion(
+                messages=chat_messages(llm, system_prompt, user_prompt),
+                max_tokens=settings.llm.MAX_TOKENS,
+                stop=[],
+                temperature=settings.llm.TEMPERATURE,
+                grammar=GRAMMARS.from_json_schema(schema),
+                stream=True,
+            )
+            for chunk in chunks:
+                content = chunk["choices"][0]["delta"].get("content")
+                if not content:
+                    continue
+                file.write(content)
+                file.flush()
+                for key, value in stream.feed(content):
+                    logger.info(f"{partial_path.name}: {key} = {json.dumps(value)[:80]}")
+        if not stream.complete:
+            raise ValueError(f"Summary stopped after {len(stream.text)} characters, before the JSON object was complete")
+        fields.update(stream.fields)
+    return json.dumps({key: fields[key] for key in SUMMARY_SCHEMA["properties"] if key in fields})
+
 def summarize_transcript(transcript_path: Path, llm: Llama) -> None:
     system_prompt = load_system_prompt()
     user_prompt = prepare_user_prompt(transcript_path=transcript_path)
@@ -87,33 +203,373 @@ def summarize_transcript(transcript_path: Path, llm: Llama) -> None:
         user_prompt=user_prompt
     )
 
+def summary_path_for(transcript_file_name: Path) -> Path:
+    return SUMMARY_DIR / f"{transcript_file_name.stem}_summary.json"
+
+def partial_path_for(transcript_file_name: Path) -> Path:
+    return SUMMARY_DIR / f"{transcript_file_name.stem}_summary.json.partial"
+
 def write_summary_to_file(summary: str, transcript_file_name: Path):
-    summary_file_name = f"{transcript_file_name.stem}_summary.json"
-    summary_path = SUMMARY_DIR / summary_file_name
+    summary_path = summary_path_for(transcript_file_name)
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
     with open(summary_path, "w") as file:
         file.write(summary)
     logger.info(f"Summary written to {summary_path}")
 
-def run_summary_pipeline(model: str, transcript_file_name: str) -> None:
-    logger.info(f"Loading model: {model}")
-    llm = load_model(model_path=MODEL_DIR / model)
-    logger.info("Loaded LLM")
+def load_manifest() -> Dict[str, Dict[str, str]]:
+    """
+    Loads the summary manifest, which records what each summary was generated from.
+
+    Returns:
+        Dict[str, Dict[str, str]]: The transcript, system prompt hashes and model of each summary, by transcript file name.
+    """
+    manifest_path = SUMMARY_DIR / MANIFEST_FILE_NAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, "r") as file:
+        return json.load(file)
+
+def write_manifest(manifest: Dict[str, Dict[str, str]]) -> None:
+    SUMMARY_DIR.mkdir(parents=True, exist_ok=True)
+    with open(SUMMARY_DIR / MANIFEST_FILE_NAME, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+def summary_fingerprint(transcript_path: Path, model: str) -> Dict[str, str]:
+    return {
+        "transcript_sha256": sha256_of_file(transcript_path),
+        "prompt_sha256": sha256_of_file(PROMPT_DIR / SYSTEM_PROMPT_FILE_NAME),
+        "model": model,
+    }
+
+def is_up_to_date(transcript_path: Path, model: str, manifest: Dict[str, Dict[str, str]]) -> bool:
+    """
+    Checks whether a transcript's summary exists and was generated from the current transcript, prompt and model.
+
+    Args:
+        transcript_path (Path): The transcript.
+        model (str): The model file name the summary would be generated with.
+        manifest (Dict[str, Dict[str, str]]): The summary manifest.
+
+    Returns:
+        bool: True if the summary does not need regenerating.
+    """
+    return (
+        summary_path_for(transcript_path).exists()
+        and manifest.get(transcript_path.name) == summary_fingerprint(transcript_path, model)
+    )
+
+def find_transcripts(pattern: str) -> List[Path]:
+    """
+    Resolves a directory or glob to transcripts. Relative patterns are looked up in TRANSCRIPT_DIR first, then in
+    the working directory.
+
+    Args:
+        pattern (str): A directory of .txt transcripts, or a glob pattern.
+
+    Returns:
+        List[Path]: The matching transcripts, sorted.
+    """
+    candidates = [Path(pattern)] if Path(pattern).is_absolute() else [TRANSCRIPT_DIR / pattern, Path(pattern)]
+    for path in candidates:
+        matches = sorted(path.glob("*.txt")) if path.is_dir() else sorted(Path(match) for match in glob.glob(str(path)))
+        if matches:
+            return matches
+    return []
+
+def available_memory_bytes() -> int | None:
+    try:
+        with open("/proc/meminfo", "r") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def default_num_workers(model_path: Path, n_ctx: int = settings.llm.CONTEXT_WINDOW) -> int:
+    """
+    Sizes the worker pool to the machine: enough workers to use every core, but no more than fit in free memory.
+
+    The model weights are memory-mapped, so the workers share one copy of them in the page cache; each worker
+    additionally needs its own KV cache for the full context window plus some compute buffers.
+
+    Args:
+        model_path (Path): The GGUF model file.
+        n_ctx (int): The context window each worker allocates.
+
+    Returns:
+        int: The number of workers, at least 1.
+    """
+    summarization = settings.summarization
+    by_cpu = max(1, (os.cpu_count() or 1) // summarization.THREADS_PER_WORKER)
+    available = available_memory_bytes()
+    if available is None:
+        return 1
+    per_worker = n_ctx * summarization.KV_CACHE_BYTES_PER_TOKEN + summarization.WORKER_OVERHEAD_BYTES
+    by_ram = max(1, (available - model_path.stat().st_size) // per_worker)
+    return int(min(by_cpu, by_ram))
+
+def _init_worker(model_path: Path, n_threads: int | None, n_ctx: int, prompt_cache: bool, persist_prompt_cache: bool) -> None:
+    """
+    Loads the model and the system prompt into a pool worker, once for all the transcripts it will summarize.
+
+    With `prompt_cache`, the KV state after the summarization and chunk system prompts is built once (or loaded from
+    PROMPT_CACHE_DIR with `persist_prompt_cache`) and restored before every call that needs it, so each transcript
+    only pays for evaluating its own tokens.
+
+    Args:
+        model_path (Path): The GGUF model file.
+        n_threads (int | None): The number of llama.cpp threads; None lets llama.cpp decide.
+        n_ctx (int): The context window to allocate.
+        prompt_cache (bool): Whether to reuse the system prompts' KV state across calls.
+        persist_prompt_cache (bool): Whether to load and save that state in PROMPT_CACHE_DIR, across runs.
+    """
+    global _WORKER_LLM, _WORKER_SYSTEM_PROMPT
+    _WORKER_LLM = load_model(model_path=model_path, n_threads=n_threads, n_ctx=n_ctx)
+    _WORKER_SYSTEM_PROMPT = load_system_prompt()
+    if not prompt_cache:
+        return
+    prefixes = [
+        chat_messages(_WORKER_LLM, _WORKER_SYSTEM_PROMPT, ""),
+        chat_messages(_WORKER_LLM, CHUNK_SYSTEM_PROMPT, ""),
+    ]
+    summarization = settings.summarization
+    cache_path = (
+        prompt_cache_path(summarization.PROMPT_CACHE_DIR, model_path, n_ctx, prefixes) if persist_prompt_cache else None
+    )
+    attach_prompt_cache(_WORKER_LLM, prefixes, summarization.PROMPT_CACHE_BYTES, cache_path)
+
+def _log_prompt_eval(kind: str) -> None:
+    tokens, seconds = prompt_eval_timings(_WORKER_LLM)
+    logger.info(f"{kind}: evaluated {tokens} prompt tokens in {seconds:.2f}s")
+
+def _summarize_in_worker(user_prompt: str, partial_path: Path | None = None) -> str:
+    reset_timings(_WORKER_LLM)
+    if partial_path is not None:
+        summary = stream_output(_WORKER_LLM, user_prompt, _WORKER_SYSTEM_PROMPT, partial_path)
+    else:
+        summary = prepare_output(llm=_WORKER_LLM, user_prompt=user_prompt, system_prompt=_WORKER_SYSTEM_PROMPT)
+    _log_prompt_eval("Summary")
+    return summary
+
+def _summarize_chunk_in_worker(text: str) -> str:
+    reset_timings(_WORKER_LLM)
+    notes = summarize_chunk(_WORKER_LLM, text, max_tokens=settings.summarization.CHUNK_SUMMARY_MAX_TOKENS)
+    _log_prompt_eval("Chunk notes")
+    return notes
+
+class _TranscriptJob:
+    """
+    The progress of one transcript through the pipeline: a single summarization call if it fits in the context
+    window, otherwise rounds of chunk summaries (map) followed by one summarization call over the notes (reduce).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.start = time.perf_counter()
+        self.notes: List[str | None] = []
+        self.tokens: int | None = None
+        self.failed = False
+
+def run_summary_pipeline(
+    model: str,
+    transcript_file_name: str,
+    num_workers: int = 1,
+    chunked: bool = False,
+    persist_prompt_cache: bool = False,
+    stream: bool = False,
+) -> None:
+    run_batch_summary_pipeline(
+        model=model,
+        transcripts=[TRANSCRIPT_DIR / transcript_file_name],
+        num_workers=num_workers,
+        force=True,
+        chunked=chunked,
+        persist_prompt_cache=persist_prompt_cache,
+        stream=stream,
+    )
+
+def run_batch_summary_pipeline(
+    model: str,
+    transcripts: List[Path],
+    num_workers: int = 0,
+    force: bool = False,
+    chunked: bool = False,
+    persist_prompt_cache: bool = False,
+    stream: bool = False,
+) -> None:
+    """
+    Summarizes many transcripts with a pool of worker processes that each keep a model loaded between transcripts.
+
+    Transcripts whose summary is up to date (same transcript, system prompt and model, per the summary manifest) are
+    skipped unless `force` is set. The manifest is updated as each summary is written, so an interrupted batch resumes
+    where it stopped.
+
+    Transcripts too long for the workers' context window are summarized hierarchically: they are split into
+    token-counted chunks of whole sentences, the chunks are summarized in parallel across the pool, and the notes are
+    summarized into the final JSON by `prepare_output` (after further rounds of chunk summaries if the notes are still
+    too long). With `chunked`, the workers allocate only CHUNKED_CONTEXT_WINDOW tokens of context, which bounds their
+    memory and keeps attention cheap; any transcript that does not fit is map-reduced.
+
+    Each worker evaluates the system prompts once and restores their KV state before every call (see
+    `_init_worker`), so the long summarization prompt is not re-evaluated for every transcript.
+
+    Args:
+        model (str): The GGUF model file name in MODEL_DIR.
+        transcripts (List[Path]): The transcripts to summarize.
+        num_workers (int): The number of worker processes; 0 sizes the pool to cores and free memory.
+        force (bool): Whether to regenerate summaries that are already up to date.
+        chunked (bool): Whether to run the workers with the smaller chunked context window.
+        persist_prompt_cache (bool): Whether to keep the system prompts' KV state on disk between runs.
+        stream (bool): Whether to stream each summary to a partial file as it is generated (see `stream_output`),
+            resuming interrupted summaries from it.
+    """
+    model_path = MODEL_DIR / model
+    manifest = load_manifest()
+    pending = [path for path in transcripts if force or not is_up_to_date(path, model, manifest)]
+    logger.info(f"{len(transcripts)} transcripts, {len(transcripts) - len(pending)} already summarized, {len(pending)} to do")
+    if not pending:
+        return
+
+    summarization = settings.summarization
+    n_ctx = summarization.CHUNKED_CONTEXT_WINDOW if chunked else settings.llm.CONTEXT_WINDOW
+    # Only the vocabulary is loaded here, to count tokens when deciding how to split transcripts
+    count_tokens = token_counter(Llama(model_path=str(model_path), vocab_only=True, verbose=False))
+    # room left for the user prompt once the system prompt, chat template and completion are accounted for
+    input_budget = n_ctx - settings.llm.MAX_TOKENS - count_tokens(load_system_prompt()) - PROMPT_TEMPLATE_TOKENS
+    chunk_budget = n_ctx - summarization.CHUNK_SUMMARY_MAX_TOKENS - count_tokens(CHUNK_SYSTEM_PROMPT) - PROMPT_TEMPLATE_TOKENS
+    chunk_tokens = min(summarization.CHUNK_TOKENS, chunk_budget)
+
+    num_workers = num_workers or default_num_workers(model_path, n_ctx)
+    if not chunked:
+        num_workers = min(num_workers, len(pending))
+    n_threads = summarization.THREADS_PER_WORKER if num_workers > 1 else None
+    logger.info(f"Summarizing with {num_workers} worker(s) of model {model}, {n_ctx} tokens of context each")
+
+    start = time.perf_counter()
+    latencies: List[float] = []
+    failures = 0
+
+    def record(job: _TranscriptJob, summary: str) -> None:
+        write_summary_to_file(summary, job.path)
+        partial_path_for(job.path).unlink(missing_ok=True)
+        manifest[job.path.name] = summary_fingerprint(job.path, model)
+        write_manifest(manifest)
+        seconds = time.perf_counter() - job.start
+        latencies.append(seconds)
+        logger.info(f"[{len(latencies) + failures}/{len(pending)}] {job.path.name} summarized in {seconds:.1f}s")
+
+    initargs = (model_path, n_threads, n_ctx, summarization.PROMPT_CACHE_ENABLED, persist_prompt_cache)
+    if num_workers == 1:
+        # a single worker runs on a thread of this process, so the model is not copied into a second process
+        executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker, initargs=initargs)
+    else:
+        # spawn rather than fork, so every worker starts clean and loads its own llama.cpp context
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=initargs,
+        )
+
+    with executor:
+        futures: Dict[Future, Tuple[_TranscriptJob, int | None]] = {}
+
+        def submit_notes_or_reduce(job: _TranscriptJob, text: str | None) -> None:
+            # the reduce prompt fits: summarize the notes, otherwise summarize another round of chunks
+            user_prompt = text if text is not None else combine_notes(job.notes)
+            tokens = count_tokens(user_prompt)
+            if job.tokens is not None:
+                check_progress(job.tokens, tokens)
+            job.tokens = tokens
+            if tokens <= input_budget:
+                partial_path = partial_path_for(job.path) if stream else None
+                futures[executor.submit(_summarize_in_worker, user_prompt, partial_path)] = (job, None)
+                return
+            chunks = chunk_by_tokens(
+                user_prompt if text is not None else "\n".join(job.notes),
+                count_tokens,
+                chunk_tokens,
+                summarization.CHUNK_OVERLAP_TOKENS,
+            )
+            logger.info(f"{job.path.name}: summarizing {len(chunks)} chunks")
+            job.notes = [None] * len(chunks)
+            for index, chunk in enumerate(chunks):
+                futures[executor.submit(_summarize_chunk_in_worker, chunk)] = (job, index)
+
+        for path in pending:
+            submit_notes_or_reduce(_TranscriptJob(path), prepare_user_prompt(transcript_path=path))
 
-    transcript_path = TRANSCRIPT_DIR / transcript_file_name
-    logger.info(f'Summarizing transcript: {transcript_file_name}')
-    summary = summarize_transcript(transcript_path=transcript_path, llm=llm)
-    logger.info(f'Summary prepared: {summary}')
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, chunk_index = futures.pop(future)
+                if job.failed:
+                    continue
+                try:
+                    result = future.result()
+                except Exception:
+                    job.failed = True
+                    failures += 1
+                    logger.exception(f"Failed to summarize {job.path.name}")
+                    continue
+                if chunk_index is None:
+                    record(job, result)
+                    continue
+                job.notes[chunk_index] = result
+                if all(note is not None for note in job.notes):
+                    try:
+                        submit_notes_or_reduce(job, None)
+                    except ValueError:
+                        job.failed = True
+                        failures += 1
+                        logger.exception(f"Failed to summarize {job.path.name}")
 
-    write_summary_to_file(summary, Path(transcript_file_name))
-    logger.info(f'Summary written to file')
+    elapsed = time.perf_counter() - start
+    if latencies:
+        logger.info(
+            f"Summarized {len(latencies)} transcripts ({failures} failed) in {elapsed:.1f}s: "
+            f"{len(latencies) / elapsed * 3600:.1f} transcripts/hour, "
+            f"{sum(latencies) / len(latencies):.1f}s per transcript"
+        )
+    else:
+        logger.error(f"All {failures} transcripts failed to summarize")
 
 
 if __name__ == "__main__":
     # Set up command-line argument parsing (you could also use Typer: https://github.com/tiangolo/typer)
     parser = argparse.ArgumentParser(description='Run the transcript summarization pipeline.')
     parser.add_argument('--model', '-m', help='local llm', default=settings.llm.MODEL_FILE_NAME)
-    parser.add_argument('--transcript-file', '-t', help='Transcript file name', required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--transcript-file', '-t', help='Transcript file name')
+    source.add_argument('--transcripts', '-d', help='Directory or glob of transcripts to summarize in batch')
+    parser.add_argument('--workers', '-w', type=int, default=settings.summarization.NUM_WORKERS, help='Worker processes (0 sizes the pool to cores and RAM)')
+    parser.add_argument('--force', action='store_true', help='Regenerate summaries that are already up to date')
+    parser.add_argument('--chunked', action='store_true', help='Use a small context window and map-reduce transcripts that do not fit')
+    parser.add_argument('--stream', action='store_true', help='Stream summaries to .partial files as they are generated, resuming interrupted ones')
+    parser.add_argument('--persist-prompt-cache', action='store_true', default=settings.summarization.PERSIST_PROMPT_CACHE, help='Keep the system prompt KV state on disk between runs')
 
     args = parser.parse_args()
 
-    run_summary_pipeline(model=args.model, transcript_file_name=args.transcript_file)
+    if args.transcript_file:
+        run_summary_pipeline(
+            model=args.model,
+            transcript_file_name=args.transcript_file,
+            num_workers=args.workers or 1,
+            chunked=args.chunked,
+            persist_prompt_cache=args.persist_prompt_cache,
+            stream=args.stream,
+        )
+    else:
+        run_batch_summary_pipeline(
+            model=args.model,
+            transcripts=find_transcripts(args.transcripts),
+            num_workers=args.workers,
+            force=args.force,
+            chunked=args.chunked,
+            persist_prompt_cache=args.persist_prompt_cache,
+            stream=args.stream,
+        )
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app import crud
+from app.db.base_class import Base
+from app.models.podcast import Episode, Podcast, Summary
+from app.schemas.podcast import EpisodeCreate
+
+
+def episode_rows(n_episodes: int) -> list:
+    return [
+        {"title": f"Episode {i}", "url": f"https://example.com/{i}", "podcast_id": 1}
+        for i in range(n_episodes)
+    ]
+
+
+async def per_row(engine: AsyncEngine, n_episodes: int) -> float:
+    """
+    Ingests episodes and their summaries the way init_db and update_db used to, one row at a time.
+    """
+    start = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        for row in episode_rows(n_episodes):
+            await crud.episode.create(db, obj_in=EpisodeCreate(**row))
+        for row in episode_rows(n_episodes):
+            episode = (await db.execute(select(Episode).where(Episode.title == row["title"]))).scalars().first()
+            summary = (await db.execute(select(Summary).where(Summary.episode_id == episode.id))).scalars().first()
+            if summary is None:
+                db.add(Summary(episode_id=episode.id, content={"summary": row["title"]}))
+        await db.commit()
+    return time.perf_counter() - start
+
+
+async def bulk(engine: AsyncEngine, n_episodes: int) -> float:
+    """
+    Ingests the same rows with `upsert_many`: one statement per few hundred rows and one commit per batch.
+    """
+    start = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        await crud.episode.upsert_many(db, objs_in=episode_rows(n_episodes), index_elements=["podcast_id", "title"])
+        episode_ids = (await db.execute(select(Episode.id))).scalars().all()
+        await crud.summary.upsert_many(
+            db,
+            objs_in=[{"episode_id": episode_id, "content": {"summary": str(episode_id)}} for episode_id in episode_ids],
+            index_elements=["episode_id"],
+        )
+    return time.perf_counter() - start
+
+
+async def run(n_episodes: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, ingest in (("per row (before)", per_row), ("upsert_many", bulk)):
+            engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp_dir) / name.split()[0]}.db")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+                await connection.execute(insert(Podcast), [{"id": 1, "name": "Developer Tea"}])
+            print(f"{name:<20} {await ingest(engine, n_episodes):>8.2f} s")
+            await engine.dispose()
+
+
+def main() -> None:
+    """
+    Compares ingesting episodes and summaries row by row with the bulk upserts init_db and update_db now use.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark per-row vs. bulk ingestion of episodes and summaries.")
+    parser.add_argument("--episodes", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"{args.episodes} episodes and summaries")
+    asyncio.run(run(args.episodes))
+
+
+if __name__ == "__main__":
+    main()
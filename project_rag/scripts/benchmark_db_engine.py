@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app import crud
+from app.config import DatabaseSettings
+from app.db.base_class import Base
+from app.db.session import create_engine
+from app.models.podcast import Episode, Podcast, Summary
+
+CONFIGS: Dict[str, DatabaseSettings] = {
+    # what app/db/session.py used to create
+    "rollback journal, echo (before)": DatabaseSettings(
+        SQL_ECHO=True, SQLITE_JOURNAL_MODE="DELETE", SQLITE_SYNCHRONOUS="FULL", SQLITE_MMAP_SIZE=0
+    ),
+    "rollback journal": DatabaseSettings(SQLITE_JOURNAL_MODE="DELETE", SQLITE_SYNCHRONOUS="FULL", SQLITE_MMAP_SIZE=0),
+    "WAL + synchronous=NORMAL + mmap": DatabaseSettings(),
+}
+
+
+async def seed(engine: AsyncEngine, n_episodes: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(Podcast), [{"id": 1, "name": "Developer Tea"}])
+        await connection.execute(
+            insert(Episode),
+            [
+                {"id": i, "title": f"Episode {i}", "url": f"https://example.com/{i}", "podcast_id": 1,
+                 "transcript": "x" * 10_000}
+                for i in range(1, n_episodes + 1)
+            ],
+        )
+        await connection.execute(
+            insert(Summary),
+            [
+                {"episode_id": i, "content": {"summary": f"Summary {i}", "quote": "Quote"}}
+                for i in range(1, n_episodes + 1)
+            ],
+        )
+
+
+async def reader(engine: AsyncEngine, n_episodes: int, deadline: float, latencies: List[float]) -> None:
+    after_id = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with AsyncSession(engine) as db:
+            await crud.episode.get_page(db=db, after_id=after_id, limit=20)
+        latencies.append(time.perf_counter() - start)
+        after_id = (after_id + 20) % n_episodes
+
+
+async def writer(engine: AsyncEngine, n_episodes: int, deadline: float) -> int:
+    writes = 0
+    while time.perf_counter() < deadline:
+        async with AsyncSession(engine) as db:
+            await crud.summary.upsert_many(
+                db,
+                objs_in=[{"episode_id": writes % n_episodes + 1, "content": {"summary": f"Revision {writes}"}}],
+                index_elements=["episode_id"],
+            )
+        writes += 1
+    return writes
+
+
+async def measure(
+    uri: str, db_settings: DatabaseSettings, n_episodes: int, readers: int, writers: int, seconds: float
+) -> Dict[str, float]:
+    """
+    Runs concurrent readers paging through episodes, alongside writers upserting summaries, for `seconds`.
+
+    Returns:
+        Dict[str, float]: Reads and writes per second, and the median and p95 read latency in ms.
+    """
+    engine = create_engine(uri, db_settings)
+    await seed(engine, n_episodes)
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+    results = await asyncio.gather(
+        *(reader(engine, n_episodes, deadline, latencies) for _ in range(readers)),
+        *(writer(engine, n_episodes, deadline) for _ in range(writers)),
+    )
+    await engine.dispose()
+    latencies.sort()
+    return {
+        "reads_per_s": len(latencies) / seconds,
+        "writes_per_s": sum(results[readers:]) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+async def run(n_episodes: int, readers: int, writers: int, seconds: float, postgres_uri: Optional[str]) -> None:
+    print(f"{n_episodes} episodes, {readers} readers, {writers} writers, {seconds}s per config")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        runs = [
+            (name, f"sqlite:///{Path(tmp_dir) / f'config_{index}.db'}", db_settings)
+            for index, (name, db_settings) in enumerate(CONFIGS.items())
+        ]
+        if postgres_uri:
+            runs.append(("postgres pool", postgres_uri, DatabaseSettings()))
+        for name, uri, db_settings in runs:
+            # echoed SQL is formatted and written as in the app, but to /dev/null rather than the terminal
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                stats = await measure(uri, db_settings, n_episodes, readers, writers, seconds)
+            print(
+                f"{name:<34} {stats['reads_per_s']:>8.0f} reads/s {stats['writes_per_s']:>6.0f} writes/s "
+                f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms"
+            )
+
+
+def main() -> None:
+    """
+    Compares concurrent read throughput and latency under the old and new engine configurations.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark concurrent reads under each database engine config.")
+    parser.add_argument("--episodes", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--postgres-uri", help="Also measure the pooled Postgres engine (its tables are recreated)")
+    args = parser.parse_args()
+    asyncio.run(run(args.episodes, args.readers, args.writers, args.seconds, args.postgres_uri))
+
+
+if __name__ == "__main__":
+    main()
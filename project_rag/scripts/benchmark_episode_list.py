@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable, Tuple
+
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, relationship, selectinload, undefer
+
+from app import crud
+from app.db.base_class import Base
+from app.models.podcast import Episode, Podcast, Summary
+
+# The schema before summaries were stored as JSON, to measure the old read path against
+LegacyBase = declarative_base()
+
+
+class LegacyEpisode(LegacyBase):
+    __tablename__ = 'episode'
+    id = Column(Integer, primary_key=True)
+    title = Column(String(255), nullable=False)
+    url = Column(String(512))
+    podcast_id = Column(Integer, nullable=False)
+    transcript = Column(Text, nullable=True)
+    summary = relationship("LegacySummary", uselist=False)
+
+
+class LegacySummary(LegacyBase):
+    __tablename__ = 'summary'
+    id = Column(Integer, primary_key=True)
+    content = Column(Text, nullable=True)
+    episode_id = Column(Integer, ForeignKey('episode.id'), unique=True)
+
+
+def summary_document(index: int) -> dict:
+    return {
+        "summary": f"Episode {index} discusses escaping functional fixedness to find leverage in everyday work. " * 3,
+        "quote": "The tools you already have can do more than you think.",
+        "interview_date": "2024-02-19",
+    }
+
+
+async def seed(engine: AsyncEngine, metadata, legacy: bool, n_episodes: int, transcript_kb: int) -> None:
+    """
+    Creates the tables and inserts `n_episodes` episodes with a transcript and a summary each.
+
+    Args:
+        engine (AsyncEngine): The engine of an empty database.
+        metadata: The metadata of the schema to create.
+        legacy (bool): Store summaries as JSON text (the old schema) rather than in the JSON column.
+        n_episodes (int): The number of episodes.
+        transcript_kb (int): The size of each transcript.
+    """
+    transcript = "x" * transcript_kb * 1024
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.create_all)
+        if not legacy:
+            await connection.execute(insert(Podcast), [{"id": 1, "name": "Developer Tea"}])
+        await connection.execute(
+            insert(LegacyEpisode if legacy else Episode),
+            [
+                {"id": i, "title": f"Episode {i}", "url": f"https://example.com/{i}", "podcast_id": 1,
+                 "transcript": transcript}
+                for i in range(1, n_episodes + 1)
+            ],
+        )
+        await connection.execute(
+            insert(LegacySummary if legacy else Summary),
+            [
+                {"episode_id": i, "content": json.dumps(summary_document(i)) if legacy else summary_document(i)}
+                for i in range(1, n_episodes + 1)
+            ],
+        )
+
+
+async def legacy_get_multi(db: AsyncSession, limit: int) -> list:
+    # what CRUDEpisode.get_multi did: load the entities, then json.loads every summary in Python
+    stmt = select(LegacyEpisode).options(selectinload(LegacyEpisode.summary)).limit(limit)
+    episodes = (await db.execute(stmt)).scalars().all()
+    return [
+        (episode.title, json.loads(episode.summary.content)["summary"] if episode.summary else None)
+        for episode in episodes
+    ]
+
+
+async def get_multi_with_transcripts(db: AsyncSession, limit: int) -> list:
+    # get_multi as it was before Episode.transcript was deferred
+    stmt = select(Episode).options(selectinload(Episode.summary), undefer(Episode.transcript)).limit(limit)
+    return (await db.execute(stmt)).scalars().all()
+
+
+async def time_query(
+    engine: AsyncEngine, query: Callable[[AsyncSession], Awaitable[list]], runs: int
+) -> Tuple[float, float]:
+    """
+    Runs a query `runs` times, each in a fresh session as a request would.
+
+    Returns:
+        Tuple[float, float]: The mean latency in ms and the peak Python memory allocated by one query in KB.
+    """
+    async with AsyncSession(engine) as db:
+        await query(db)  # warm up the connection and the statement cache
+    tracemalloc.start()
+    async with AsyncSession(engine) as db:
+        await query(db)
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(runs):
+        async with AsyncSession(engine) as db:
+            await query(db)
+    return (time.perf_counter() - start) * 1000 / runs, peak_kb
+
+
+async def run(n_episodes: int, transcript_kb: int, limit: int, runs: int) -> None:
+    """
+    Seeds both schemas with the same episodes and prints the latency and memory of each way of listing them.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp_dir) / 'legacy.db'}")
+        json_engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp_dir) / 'json.db'}")
+        await seed(legacy_engine, LegacyBase.metadata, True, n_episodes, transcript_kb)
+        await seed(json_engine, Base.metadata, False, n_episodes, transcript_kb)
+
+        variants = {
+            "text column + json.loads (before)": (legacy_engine, lambda db: legacy_get_multi(db, limit)),
+            "JSON column, get_multi + transcripts": (json_engine, lambda db: get_multi_with_transcripts(db, limit)),
+            "JSON column, get_multi (deferred)": (json_engine, lambda db: crud.episode.get_multi(db=db, limit=limit)),
+            "JSON column, SQL projection": (
+                json_engine, lambda db: crud.episode.get_multi_summary_fields(db=db, limit=limit)
+            ),
+        }
+        print(f"{n_episodes} episodes, {transcript_kb}KB transcripts, limit={limit}, {runs} runs")
+        for name, (engine, query) in variants.items():
+            latency_ms, peak_kb = await time_query(engine, query, runs)
+            print(f"{name:<40} {latency_ms:>8.2f} ms {peak_kb:>10.0f} KB peak")
+
+        await legacy_engine.dispose()
+        await json_engine.dispose()
+
+
+def main() -> None:
+    """
+    Compares the homepage episode list query with summaries stored as JSON text vs. in the JSON column, and with
+    transcripts loaded vs. deferred, for each transcript size.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the homepage episode list query.")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--transcript-kb", type=int, nargs="+", default=[10, 100, 250])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    for transcript_kb in args.transcript_kb:
+        asyncio.run(run(args.episodes, transcript_kb, args.limit, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app import crud
+from app.crud.base import CRUDBase
+from app.db.base_class import Base
+from app.models.podcast import Episode, Podcast
+
+
+async def seed(engine: AsyncEngine, n_episodes: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(Podcast), [{"id": 1, "name": "Developer Tea"}])
+        await connection.execute(
+            insert(Episode),
+            [
+                {"id": i, "title": f"Episode {i}", "url": f"https://example.com/{i}", "podcast_id": 1}
+                for i in range(1, n_episodes + 1)
+            ],
+        )
+
+
+async def time_page(engine: AsyncEngine, fetch: Callable[[AsyncSession], Awaitable[list]], runs: int) -> float:
+    """
+    Fetches the same page `runs` times and returns the mean latency in ms.
+    """
+    async with AsyncSession(engine) as db:
+        await fetch(db)  # warm up the connection and the statement cache
+        start = time.perf_counter()
+        for _ in range(runs):
+            await fetch(db)
+            db.expunge_all()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+async def run(n_episodes: int, page_size: int, runs: int) -> None:
+    """
+    Times the page at several depths of the catalogue with offset and keyset pagination.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp_dir) / 'episodes.db'}")
+        await seed(engine, n_episodes)
+        print(f"{n_episodes} episodes, {page_size} per page, {runs} runs")
+        print(f"{'depth':>8} {'offset':>10} {'keyset':>10}")
+        for depth in (0, n_episodes // 10, n_episodes // 2, n_episodes - page_size):
+            # CRUDBase's offset query, so both select the same columns (CRUDEpisode.get_multi also loads summaries)
+            offset_ms = await time_page(
+                engine, lambda db: CRUDBase.get_multi(crud.episode, db=db, skip=depth, limit=page_size), runs
+            )
+            # the id of the last row of the previous page, as decoded from the /episodes cursor
+            keyset_ms = await time_page(
+                engine, lambda db: crud.episode.get_page(db=db, after_id=depth or None, limit=page_size), runs
+            )
+            print(f"{depth:>8} {offset_ms:>8.2f}ms {keyset_ms:>8.2f}ms")
+        await engine.dispose()
+
+
+def main() -> None:
+    """
+    Compares the latency of offset (`CRUDBase.get_multi`) and keyset (`get_page`) pagination as pages get deeper.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark offset vs. keyset pagination of episodes.")
+    parser.add_argument("--episodes", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.episodes, args.page_size, args.runs))
+
+
+if __name__ == "__main__":
+    main()
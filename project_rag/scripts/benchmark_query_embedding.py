@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import time
+from typing import List
+
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+from app.config import settings
+from app.query_embedder import QueryEmbeddingBatcher
+
+
+def make_queries(n_queries: int) -> List[str]:
+    """
+    Builds distinct questions, so the LRU cache does not flatter the batched numbers.
+    """
+    return [f"What did the guest say about topic number {i} on Developer Tea?" for i in range(n_queries)]
+
+
+async def run_unbatched(embed_model: HuggingFaceEmbedding, queries: List[str]) -> float:
+    """
+    The previous behaviour: every request embeds its own query on the event loop.
+
+    Returns:
+        float: Queries per second.
+    """
+    async def handle(query: str) -> None:
+        embed_model.get_query_embedding(query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[handle(query) for query in queries])
+    return len(queries) / (time.perf_counter() - start)
+
+
+async def run_batched(embed_model: HuggingFaceEmbedding, queries: List[str]) -> float:
+    """
+    Concurrent requests share batched forward passes on the embedder thread.
+
+    Returns:
+        float: Queries per second.
+    """
+    batcher = QueryEmbeddingBatcher(
+        embed_model=embed_model,
+        max_batch_size=settings.embedding.QUERY_BATCH_SIZE,
+        max_wait_ms=settings.embedding.QUERY_BATCH_WAIT_MS,
+        cache_size=settings.embedding.QUERY_CACHE_SIZE,
+    )
+    await batcher.start()
+    start = time.perf_counter()
+    await asyncio.gather(*[batcher.embed(query) for query in queries])
+    qps = len(queries) / (time.perf_counter() - start)
+    await batcher.stop()
+    return qps
+
+
+async def main() -> None:
+    """
+    Compares query-embedding throughput with and without micro-batching under concurrent load.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark query embedding micro-batching.")
+    parser.add_argument("--queries", type=int, default=128)
+    args = parser.parse_args()
+
+    embed_model = HuggingFaceEmbedding(model_name=settings.embedding.MODEL_NAME)
+    embed_model.get_query_embedding("warm up")
+    queries = make_queries(args.queries)
+
+    print(f"{args.queries} concurrent queries, {settings.embedding.MODEL_NAME}")
+    print(f"unbatched: {await run_unbatched(embed_model, queries):.1f} queries/sec")
+    print(f"batched:   {await run_batched(embed_model, queries):.1f} queries/sec")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import statistics
+import time
+from typing import Callable, List
+
+from llama_index.core import Document, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+
+from app import deps
+from app.config import TRANSCRIPT_DIR
+from app.engine_registry import QueryEngineRegistry
+
+N_REQUESTS: int = 200
+
+
+def build_index() -> VectorStoreIndex:
+    """
+    Builds a throwaway index over the bundled transcripts using a mock embedding model.
+
+    Returns:
+        VectorStoreIndex: An in-memory index with the same node count as the real one.
+    """
+    documents = [
+        Document(text=path.read_text(encoding="utf-8"), metadata={"file_name": path.name})
+        for path in sorted(TRANSCRIPT_DIR.glob("*.txt"))
+    ]
+    return VectorStoreIndex.from_documents(documents, embed_model=MockEmbedding(embed_dim=1024))
+
+
+def time_per_request(acquire_engine: Callable[[], object]) -> List[float]:
+    """
+    Measures how long it takes to obtain a query engine, once per simulated request.
+
+    Args:
+        acquire_engine (Callable[[], object]): The per-request engine acquisition to time.
+
+    Returns:
+        List[float]: The duration of each acquisition in milliseconds.
+    """
+    timings = []
+    for _ in range(N_REQUESTS):
+        start = time.perf_counter()
+        acquire_engine()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]) -> None:
+    """
+    Prints the mean, median and 95th percentile of a set of timings.
+
+    Args:
+        label (str): The name of the measured variant.
+        timings (List[float]): The measured durations in milliseconds.
+    """
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<10} mean={statistics.mean(timings):8.3f}ms  p50={statistics.median(timings):8.3f}ms  p95={p95:8.3f}ms")
+
+
+def main() -> None:
+    """
+    Compares the old per-request engine construction with the cached registry lookup.
+    """
+    index = build_index()
+
+    # Before: a fresh LLM (and HTTP client) plus retriever and synthesizer on every request
+    before = time_per_request(lambda: index.as_query_engine(streaming=True, llm=deps.get_llm()))
+
+    # After: engines are built once and looked up by (model, temperature, top-k)
+    registry = QueryEngineRegistry(index=index, llm_factory=deps.get_llm)
+    registry.get()
+    after = time_per_request(registry.get)
+
+    print(f"Per-request query engine overhead over {N_REQUESTS} requests")
+    report("before", before)
+    report("after", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+from app.vector_store import NumpyVectorStore
+
+EMBED_DIM: int = 1024  # UAE-Large-V1
+
+
+def current_rss_mb() -> float:
+    """
+    Returns the resident set size of this process in MB (Linux only).
+    """
+    with open("/proc/self/statm") as handler:
+        resident_pages = int(handler.read().split()[1])
+    return resident_pages * 4096 / 1024 / 1024
+
+
+def build_stores(persist_dir: Path, n_nodes: int) -> None:
+    """
+    Persists the same random embeddings with both SimpleVectorStore and NumpyVectorStore.
+
+    Args:
+        persist_dir (Path): Where to write the two stores.
+        n_nodes (int): The number of nodes to generate.
+    """
+    rng = np.random.default_rng(42)
+    nodes = [
+        TextNode(id_=f"node-{i}", text="", embedding=rng.normal(size=EMBED_DIM).tolist())
+        for i in range(n_nodes)
+    ]
+    simple_store = SimpleVectorStore()
+    simple_store.add(nodes)
+    simple_store.persist(str(persist_dir / "simple" / "default__vector_store.json"))
+    numpy_store = NumpyVectorStore()
+    numpy_store.add(nodes)
+    numpy_store.persist(str(persist_dir / "numpy" / "default__vector_store.json"))
+
+
+def measure(store_type: str, persist_dir: Path, n_queries: int) -> dict:
+    """
+    Loads one store and runs top-k queries against it, in the current process.
+
+    Args:
+        store_type (str): Either "simple" or "numpy".
+        persist_dir (Path): The directory passed to `build_stores`.
+        n_queries (int): The number of queries to time.
+
+    Returns:
+        dict: Load time, RSS growth and mean query latency.
+    """
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    if store_type == "simple":
+        store = SimpleVectorStore.from_persist_path(str(persist_dir / "simple" / "default__vector_store.json"))
+    else:
+        store = NumpyVectorStore.from_persist_dir(persist_dir / "numpy")
+    load_seconds = time.perf_counter() - start
+    rss_after_load = current_rss_mb()
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(n_queries):
+        store.query(VectorStoreQuery(query_embedding=rng.normal(size=EMBED_DIM).tolist(), similarity_top_k=2))
+    query_ms = (time.perf_counter() - start) * 1000 / n_queries
+
+    return {
+        "store": store_type,
+        "load_s": round(load_seconds, 3),
+        "load_rss_mb": round(rss_after_load - rss_before, 1),
+        "query_ms": round(query_ms, 3),
+        "final_rss_mb": round(current_rss_mb() - rss_before, 1),
+    }
+
+
+def main() -> None:
+    """
+    Compares load time, memory and query latency of the JSON and memory-mapped vector stores.
+
+    Each store is measured in a fresh interpreter so the RSS numbers are not polluted by the other.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark SimpleVectorStore vs. NumpyVectorStore.")
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--measure", choices=["simple", "numpy"], help=argparse.SUPPRESS)
+    parser.add_argument("--persist-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.persist_dir, args.queries)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        persist_dir = Path(tmp_dir)
+        build_stores(persist_dir, args.nodes)
+        print(f"{args.nodes} nodes x {EMBED_DIM} dims, {args.queries} queries")
+        for store_type in ("simple", "numpy"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", store_type, "--persist-dir", str(persist_dir),
+                 "--queries", str(args.queries)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            print(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import time
+from typing import Tuple
+
+import httpx
+
+
+async def stream_once(client: httpx.AsyncClient, url: str, message: str) -> Tuple[float, float]:
+    """
+    Sends one streaming chat request and reads the response to the end.
+
+    Args:
+        client (httpx.AsyncClient): The shared HTTP client.
+        url (str): The streaming endpoint.
+        message (str): The user message to send.
+
+    Returns:
+        Tuple[float, float]: Seconds to the first chunk and seconds to the end of the stream.
+    """
+    start = time.perf_counter()
+    first_chunk = None
+    async with client.stream("POST", url, json={"user_message": message}) as response:
+        response.raise_for_status()
+        async for _ in response.aiter_raw():
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return first_chunk if first_chunk is not None else total, total
+
+
+async def main() -> None:
+    """
+    Fires concurrent streaming requests at a running server and checks whether they overlap.
+
+    If the server handled streams one at a time, the wall-clock time would be close to the sum of the
+    individual stream durations (an overlap factor close to 1). Streams that genuinely run concurrently
+    finish in roughly the time of the slowest one, so the overlap factor approaches the concurrency.
+    """
+    parser = argparse.ArgumentParser(description="Load test the RAG streaming endpoint.")
+    parser.add_argument("--url", default="http://localhost:8001/inference/stream/")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--message", default="Tell me about Developer Tea")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        # warm-up, so model loading or lazy initialisation is not counted
+        await stream_once(client, args.url, args.message)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[stream_once(client, args.url, f"{args.message} ({i})") for i in range(args.concurrency)]
+        )
+        wall = time.perf_counter() - start
+
+    first_chunks = sorted(first_chunk for first_chunk, _ in results)
+    totals = [total for _, total in results]
+    print(f"{args.concurrency} concurrent streams in {wall:.2f}s")
+    print(f"time to first chunk: min={first_chunks[0]:.2f}s  median={first_chunks[len(first_chunks) // 2]:.2f}s  max={first_chunks[-1]:.2f}s")
+    print(f"stream duration: sum={sum(totals):.2f}s  max={max(totals):.2f}s")
+    print(f"overlap factor (sum / wall): {sum(totals) / wall:.1f}x  (1.0x means the streams were serialized)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
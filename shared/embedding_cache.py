@@ -0,0 +1,115 @@
+import hashlib
+import sqlite3
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence
+
+try:
+    from llama_index.core.bridge.pydantic import PrivateAttr
+    from llama_index.core.embeddings import BaseEmbedding
+except ImportError:  # llama-index < 0.10, as pinned in the root requirements.txt
+    from llama_index.bridge.pydantic import PrivateAttr
+    from llama_index.embeddings.base import BaseEmbedding
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_LOOKUP_CHUNK_SIZE = 500
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """sha256 of the model name and the exact text that is embedded."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk store of embeddings, backed by a single SQLite file.
+
+    Embeddings are keyed by sha256(model name + chunk text), so a chunk is only ever embedded
+    once per model no matter which index, chunking run or transcript it came from.
+    Vectors are stored as raw float32 bytes.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return the cached embedding of each text, or None where there is none."""
+        keys = [embedding_key(model_name, text) for text in texts]
+        found = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+            chunk = keys[start : start + _LOOKUP_CHUNK_SIZE]
+            rows = self._connection.execute(
+                f"SELECT key, embedding FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        return [found.get(key) for key in keys]
+
+    def put_many(
+        self, model_name: str, texts: Iterable[str], embeddings: Iterable[Sequence[float]]
+    ) -> None:
+        """Store the embedding of each text, in a single transaction."""
+        rows = [
+            (embedding_key(model_name, text), array("f", embedding).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)", rows
+            )
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Wraps an embedding model (e.g. HuggingFaceEmbedding) so text embeddings go through an EmbeddingCache.
+
+    Only the cache misses of each batch reach the wrapped model. Query embeddings are not cached.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, cache: EmbeddingCache, **kwargs: Any):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._cache = cache
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed_model.get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return await self._embed_model.aget_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self._cache.get_many(self.model_name, texts)
+        missing = [position for position, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[position] for position in missing]
+            new_embeddings = self._embed_model.get_text_embedding_batch(missing_texts)
+            self._cache.put_many(self.model_name, missing_texts, new_embeddings)
+            for position, embedding in zip(missing, new_embeddings):
+                embeddings[position] = embedding
+        return embeddings
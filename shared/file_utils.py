@@ -0,0 +1,11 @@
+import hashlib
+from pathlib import Path
+
+
+def sha256_of_file(path: Path) -> str:
+    """The sha256 hex digest of a file's contents, read in 1MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,11 +1,83 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, Union
+
 from llama_cpp import LlamaGrammar
+from llama_cpp.llama_grammar import JSON_GBNF, json_schema_to_gbnf
 
 from shared.settings import DATA_DIR
 
 
+class GrammarRegistry:
+    """Compiles GBNF grammars and JSON schemas to LlamaGrammar once per process, cached by content hash.
+
+    A compiled grammar is not tied to a model, so the same one can be passed to any Llama. Its matching state is
+    reset at the start of every generation, so it can be reused by one generation after another, but must not be
+    used by two generations running at the same time. Grammars hold C pointers and cannot be pickled, so each
+    worker process compiles its own.
+    """
+
+    def __init__(self):
+        self._grammars: Dict[str, LlamaGrammar] = {}
+        # file path -> (mtime_ns, size, content hash), so unchanged files are not re-read
+        self._files: Dict[Path, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def from_string(self, gbnf: str) -> LlamaGrammar:
+        """The compiled grammar of a GBNF string."""
+        return self._get(hashlib.sha256(gbnf.encode("utf-8")).hexdigest(), lambda: gbnf)
+
+    def from_file(self, path: Path) -> LlamaGrammar:
+        """The compiled grammar of a GBNF file, re-read only when the file changes."""
+        stat = path.stat()
+        cached = self._files.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return self._get(cached[2], path.read_text)
+        gbnf = path.read_text()
+        key = hashlib.sha256(gbnf.encode("utf-8")).hexdigest()
+        self._files[path] = (stat.st_mtime_ns, stat.st_size, key)
+        return self._get(key, lambda: gbnf)
+
+    def from_json_schema(self, schema: Union[Dict[str, Any], str]) -> LlamaGrammar:
+        """The compiled grammar of a JSON schema, given as a dict or a JSON string."""
+        if isinstance(schema, str):
+            schema = json.loads(schema)
+        # not key-sorted: the grammar emits properties in schema order, so differently ordered schemas differ
+        canonical = json.dumps(schema)
+        key = hashlib.sha256(f"schema\0{canonical}".encode("utf-8")).hexdigest()
+        return self._get(key, lambda: json_schema_to_gbnf(canonical))
+
+    def json_object(self) -> LlamaGrammar:
+        """The grammar of any JSON object, as used by response_format={"type": "json_object"}."""
+        return self.from_string(JSON_GBNF)
+
+    def stats(self) -> Dict[str, int]:
+        return {"grammars": len(self._grammars), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._grammars.clear()
+            self._files.clear()
+
+    def _get(self, key: str, gbnf: Callable[[], str]) -> LlamaGrammar:
+        with self._lock:
+            grammar = self._grammars.get(key)
+            if grammar is not None:
+                self.hits += 1
+                return grammar
+            self.misses += 1
+            grammar = LlamaGrammar.from_string(gbnf(), verbose=False)
+            self._grammars[key] = grammar
+            return grammar
+
+
+# One registry per process, shared by every model in it
+GRAMMARS = GrammarRegistry()
+
+
 def load_grammar() -> LlamaGrammar:
-    file_path = DATA_DIR / "llama.gbnf"
-    print(f"Reading grammar file from: {file_path}")  # Debug print
-    with open(file_path, "r") as handler:
-        content = handler.read()
-        return LlamaGrammar.from_string(content)
+    return GRAMMARS.from_file(DATA_DIR / "llama.gbnf")
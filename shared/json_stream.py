@@ -0,0 +1,77 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JSONObjectStream:
+    """Incrementally parses a JSON object as it is generated, reporting each top-level member once its value closes.
+
+    Strings, objects and arrays are reported at their closing character; numbers, booleans and null at the
+    following comma or closing brace, as nothing earlier marks their end. Each character is scanned once, however
+    the text is split into chunks.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+        self._after_colon = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Adds generated text, returning the (key, value) of every member that closed in it."""
+        self.text += chunk
+        closed: List[Tuple[str, Any]] = []
+        for index in range(self._position, len(self.text)):
+            char = self.text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._after_colon:
+                        closed += self._close_member(index + 1)
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._start_member(index + 1)
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._after_colon:
+                    closed += self._close_member(index + 1)
+                elif self._depth == 0:
+                    closed += self._close_member(index)
+                    self.complete = True
+            elif self._depth == 1:
+                if char == ":":
+                    self._after_colon = True
+                elif char == ",":
+                    closed += self._close_member(index)
+                    self._start_member(index + 1)
+        self._position = len(self.text)
+        return closed
+
+    def _start_member(self, start: int) -> None:
+        self._member_start = start
+        self._after_colon = False
+
+    def _close_member(self, end: int) -> List[Tuple[str, Any]]:
+        # a member whose value was already reported (at its closing quote or bracket) is skipped at the comma
+        if self._member_start is None or not self._after_colon:
+            return []
+        member = self.text[self._member_start:end]
+        self._member_start = None
+        try:
+            ((key, value),) = json.loads("{" + member + "}").items()
+        except ValueError:
+            return []
+        self.fields[key] = value
+        return [(key, value)]
@@ -0,0 +1,151 @@
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from prometheus_client import REGISTRY, Counter, Histogram, start_http_server, write_to_textfile
+
+if TYPE_CHECKING:
+    # only for annotations: the FastAPI apps share these metrics without installing llama-cpp-python
+    from llama_cpp import Llama
+
+LABELS = ["model", "endpoint"]
+
+TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from the start of an LLM call to its first generated token.",
+    LABELS,
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 20, 30, 60),
+)
+INTER_TOKEN_LATENCY = Histogram(
+    "llm_inter_token_latency_seconds",
+    "Time between consecutive generated tokens.",
+    LABELS,
+    buckets=(0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 1),
+)
+REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "Total duration of an LLM call, from request to last token.",
+    LABELS,
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300),
+)
+TOKENS_PER_SECOND = Histogram(
+    "llm_tokens_per_second",
+    "Decode throughput of an LLM call, in completion tokens per second.",
+    LABELS,
+    buckets=(1, 2, 5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300),
+)
+PROMPT_TOKENS = Counter("llm_prompt_tokens", "Prompt tokens sent to the model.", LABELS)
+COMPLETION_TOKENS = Counter("llm_completion_tokens", "Completion tokens generated by the model.", LABELS)
+REQUESTS = Counter("llm_requests", "LLM calls, by outcome.", LABELS + ["status"])
+
+
+class LLMCallMetrics:
+    """Records the latency profile and token counts of one LLM call.
+
+    Create it just before the call, call `token()` as each token arrives and `finish()` at the end.
+    Time to first token and inter-token latency are only recorded for streamed calls.
+    """
+
+    def __init__(self, model: str, endpoint: str):
+        self.labels = {"model": model, "endpoint": endpoint}
+        self.completion_tokens = 0
+        self._start = time.perf_counter()
+        self._first_token: Optional[float] = None
+        self._last_token: Optional[float] = None
+        self._finished = False
+
+    def token(self, count: int = 1) -> None:
+        """Record the arrival of `count` generated tokens."""
+        now = time.perf_counter()
+        if self._first_token is None:
+            self._first_token = now
+            TIME_TO_FIRST_TOKEN.labels(**self.labels).observe(now - self._start)
+        else:
+            INTER_TOKEN_LATENCY.labels(**self.labels).observe(now - self._last_token)
+        self._last_token = now
+        self.completion_tokens += count
+
+    def finish(
+        self,
+        status: str = "ok",
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ) -> None:
+        """Record the end of the call; later calls are ignored.
+
+        Token counts reported by the server take precedence over the number of tokens seen by `token()`.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        end = time.perf_counter()
+        completion_tokens = self.completion_tokens if completion_tokens is None else completion_tokens
+
+        REQUEST_DURATION.labels(**self.labels).observe(end - self._start)
+        REQUESTS.labels(**self.labels, status=status).inc()
+        COMPLETION_TOKENS.labels(**self.labels).inc(completion_tokens)
+        if prompt_tokens is not None:
+            PROMPT_TOKENS.labels(**self.labels).inc(prompt_tokens)
+
+        # Decode rate excludes the prompt processing before the first token when the call was streamed
+        if self._first_token is not None and self._last_token > self._first_token and completion_tokens > 1:
+            TOKENS_PER_SECOND.labels(**self.labels).observe((completion_tokens - 1) / (self._last_token - self._first_token))
+        elif completion_tokens and end > self._start:
+            TOKENS_PER_SECOND.labels(**self.labels).observe(completion_tokens / (end - self._start))
+
+
+def create_chat_completion(llm: "Llama", endpoint: str, **kwargs: Any) -> Dict[str, Any]:
+    """Run `llm.create_chat_completion` with token-level metrics, returning the same response dict.
+
+    The completion is streamed under the hood so each token can be timed, then reassembled into
+    the non-streamed response format. llama.cpp does not report usage when streaming, so completion
+    tokens are counted from the stream and prompt tokens are derived from the context length.
+    """
+    metrics = LLMCallMetrics(model=Path(llm.model_path).name, endpoint=endpoint)
+    content: List[str] = []
+    completion_id, created, finish_reason = "", 0, None
+    try:
+        for chunk in llm.create_chat_completion(stream=True, **kwargs):
+            completion_id, created = chunk["id"], chunk["created"]
+            choice = chunk["choices"][0]
+            finish_reason = choice["finish_reason"] or finish_reason
+            text = choice["delta"].get("content")
+            if text:
+                metrics.token()
+                content.append(text)
+    except Exception:
+        metrics.finish(status="error")
+        raise
+
+    completion_tokens = metrics.completion_tokens
+    prompt_tokens = max(llm.n_tokens - completion_tokens, 0)
+    metrics.finish(prompt_tokens=prompt_tokens)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": llm.model_path,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(content)},
+                "finish_reason": finish_reason,
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def serve_metrics(port: int = 8000) -> None:
+    """Expose the metrics in Prometheus text format on http://0.0.0.0:<port>/metrics, for long-running scripts."""
+    start_http_server(port)
+
+
+def write_metrics(path: Path) -> None:
+    """Write the metrics in Prometheus text format, e.g. for the node_exporter textfile collector."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_to_textfile(str(path), REGISTRY)
@@ -0,0 +1,185 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import llama_cpp
+from llama_cpp import Llama
+
+from shared.settings import MODEL_RAM_BUDGET_BYTES
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+@dataclass
+class LoadedModel:
+    """A model held by the registry, with what it cost to load.
+
+    `mapped_bytes` is the GGUF file, memory-mapped: the page cache holds only the weights that have been used,
+    and they are shared by every process mapping the same file. `context_bytes` is the KV cache and output
+    buffers llama.cpp allocated for the context window. `rss_delta_bytes` is how much the process' resident
+    memory grew during the load.
+    """
+
+    llm: Llama
+    path: Path
+    params: Dict[str, Any]
+    load_seconds: float
+    mapped_bytes: int
+    context_bytes: int
+    rss_delta_bytes: int
+    last_used: float
+
+    @property
+    def budget_bytes(self) -> int:
+        # the worst case, once every weight has been paged in
+        return self.mapped_bytes + self.context_bytes
+
+
+def _hashable(value: Any) -> Any:
+    """The value with lists (e.g. tensor_split) and dicts turned into tuples, for use in a model key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((name, _hashable(item)) for name, item in value.items()))
+    return value
+
+
+def resident_memory_bytes() -> int:
+    """The resident set size of this process (0 where /proc is not available)."""
+    try:
+        with open("/proc/self/statm", "r") as handler:
+            return int(handler.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+class ModelRegistry:
+    """Loads llama.cpp models on first use and shares them between callers.
+
+    Callers asking for the same file with the same parameters get the same Llama instance. Weights are
+    memory-mapped (`use_mmap=True`), so loading is fast and pages are only read from disk when used. When
+    loading a model would exceed the RAM budget, the least recently used models are dropped first; a dropped
+    model is freed once its callers release it too. A Llama instance is not thread-safe, so callers sharing one
+    must not generate with it concurrently.
+    """
+
+    def __init__(self, ram_budget_bytes: Optional[int] = None):
+        self.ram_budget_bytes = ram_budget_bytes
+        self._models: "OrderedDict[ModelKey, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_path: Path, **params: Any) -> Llama:
+        """
+        The model loaded from `model_path` with these Llama parameters, loading it if no caller has yet.
+
+        Args:
+            model_path (Path): The GGUF model file.
+            **params: Llama constructor parameters, such as n_ctx, n_gpu_layers and chat_format.
+
+        Returns:
+            Llama: The shared model instance.
+        """
+        params.setdefault("use_mmap", True)
+        key = (str(Path(model_path).resolve()), _hashable(params))
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is None:
+                # the context size is only known once llama.cpp has allocated it: make room for the weights before
+                # loading, then for the weights and the context together
+                self._make_room(Path(model_path).stat().st_size)
+                loaded = self._load(Path(model_path), params)
+                self._make_room(loaded.budget_bytes)
+                self._models[key] = loaded
+            self._models.move_to_end(key)
+            loaded.last_used = time.time()
+            return loaded.llm
+
+    def evict(self, model_path: Path) -> None:
+        """Drops every instance of a model, whatever its parameters."""
+        path = str(Path(model_path).resolve())
+        with self._lock:
+            for key in [key for key in self._models if key[0] == path]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._models):
+                self._drop(key)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Load time and memory of each loaded model, least recently used first."""
+        with self._lock:
+            return [
+                {
+                    "model": loaded.path.name,
+                    "n_ctx": loaded.params.get("n_ctx"),
+                    "load_seconds": loaded.load_seconds,
+                    "mapped_bytes": loaded.mapped_bytes,
+                    "context_bytes": loaded.context_bytes,
+                    "rss_delta_bytes": loaded.rss_delta_bytes,
+                    "last_used": loaded.last_used,
+                }
+                for loaded in self._models.values()
+            ]
+
+    def report(self) -> str:
+        """The stats as a table, in seconds and MiB."""
+        lines = [f"{'model':<45} {'n_ctx':>7} {'load':>8} {'mapped':>10} {'context':>10} {'rss delta':>10}"]
+        for stats in self.stats():
+            lines.append(
+                f"{stats['model']:<45} {stats['n_ctx'] or '-':>7} {stats['load_seconds']:>7.2f}s "
+                + " ".join(
+                    f"{stats[key] / 2**20:>7.0f}MiB" for key in ("mapped_bytes", "context_bytes", "rss_delta_bytes")
+                )
+            )
+        return "\n".join(lines)
+
+    def _load(self, model_path: Path, params: Dict[str, Any]) -> LoadedModel:
+        rss_before = resident_memory_bytes()
+        start = time.perf_counter()
+        llm = Llama(model_path=str(model_path), **params)
+        load_seconds = time.perf_counter() - start
+        loaded = LoadedModel(
+            llm=llm,
+            path=model_path,
+            params=params,
+            load_seconds=load_seconds,
+            mapped_bytes=model_path.stat().st_size,
+            context_bytes=int(llama_cpp.llama_get_state_size(llm.ctx)),
+            rss_delta_bytes=max(0, resident_memory_bytes() - rss_before),
+            last_used=time.time(),
+        )
+        logger.info(
+            f"Loaded {model_path.name} in {load_seconds:.2f}s "
+            f"({loaded.mapped_bytes / 2**20:.0f}MiB mapped, {loaded.context_bytes / 2**20:.0f}MiB context)"
+        )
+        return loaded
+
+    def _make_room(self, needed_bytes: int) -> None:
+        if self.ram_budget_bytes is None:
+            return
+        used = sum(loaded.budget_bytes for loaded in self._models.values())
+        while self._models and used + needed_bytes > self.ram_budget_bytes:
+            key = next(iter(self._models))
+            used -= self._models[key].budget_bytes
+            self._drop(key)
+        if used + needed_bytes > self.ram_budget_bytes:
+            logger.warning(f"Loading {needed_bytes / 2**20:.0f}MiB exceeds the model RAM budget on its own")
+
+    def _drop(self, key: ModelKey) -> None:
+        loaded = self._models.pop(key)
+        logger.info(f"Evicted {loaded.path.name} (n_ctx={loaded.params.get('n_ctx')})")
+        del loaded
+        gc.collect()
+
+
+# One registry per process, shared by every caller in it
+MODELS = ModelRegistry(ram_budget_bytes=MODEL_RAM_BUDGET_BYTES)
@@ -0,0 +1,134 @@
+import copy
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import llama_cpp
+from llama_cpp import Llama, LlamaRAMCache, LlamaState
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+def _expand(rows: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    # np.zeros is lazily allocated, and the rows past the saved tokens are overwritten before they are read
+    full = np.zeros(shape, dtype=rows.dtype)
+    full[: len(rows)] = rows
+    return full
+
+
+class PromptPrefixCache(LlamaRAMCache):
+    """KV states of fixed prompt prefixes, such as a long system prompt, shared by many completions.
+
+    Attached with `llm.set_cache()`, it is consulted by llama-cpp-python before every completion: when a stored
+    state shares a longer token prefix with the prompt than the model's current context does, the state is loaded
+    and only the rest of the prompt is evaluated. Unlike LlamaRAMCache, it only keeps the states recorded with
+    `record`, not the state after every completion.
+
+    States are those returned by `Llama.save_state()`, handed back to `Llama.load_state()` in the same layout.
+    Where a llama-cpp-python release saves the whole context-window-sized token and logits buffers (0.2.38 does),
+    only the rows of the evaluated tokens are kept in memory, and the buffers are rebuilt at their saved size.
+    """
+
+    def __init__(self, capacity_bytes: int = 2 << 30):
+        super().__init__(capacity_bytes=capacity_bytes)
+        self.recording = False
+
+    def __getitem__(self, key: Sequence[int]) -> LlamaState:
+        state = super().__getitem__(key)
+        shapes = getattr(state, "_full_shapes", None)
+        if shapes is None:
+            return state
+        restored = copy.copy(state)
+        restored.input_ids = _expand(state.input_ids, shapes[0])
+        restored.scores = _expand(state.scores, shapes[1])
+        del restored._full_shapes
+        return restored
+
+    def __setitem__(self, key: Sequence[int], value: LlamaState) -> None:
+        if not self.recording:
+            return
+        if len(value.input_ids) > value.n_tokens or len(value.scores) > value.n_tokens:
+            compact = copy.copy(value)
+            compact.input_ids = value.input_ids[: value.n_tokens].copy()
+            compact.scores = value.scores[: value.n_tokens].copy()
+            compact._full_shapes = (value.input_ids.shape, value.scores.shape)
+            value = compact
+        super().__setitem__(key, value)
+
+    def record(self, llm: Llama, messages: Messages) -> None:
+        """Evaluates a chat prompt and stores the model's state, for later prompts that start the same way."""
+        self.recording = True
+        try:
+            llm.create_chat_completion(messages=messages, max_tokens=1, temperature=0)
+        finally:
+            self.recording = False
+
+    def save(self, path: Path) -> None:
+        """Writes the recorded states to a file, atomically so concurrent workers never read a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(partial, "wb") as file:
+            pickle.dump(self.cache_state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+
+    def load(self, path: Path) -> None:
+        with open(path, "rb") as file:
+            self.cache_state = pickle.load(file)
+
+
+def prompt_cache_path(cache_dir: Path, model_path: Path, n_ctx: int, prompts: List[Messages]) -> Path:
+    """The file holding the prefix states of these prompts: states are only valid for the same model, context
+    window and llama.cpp build."""
+    key = hashlib.sha256()
+    for part in (model_path.name, str(model_path.stat().st_size), str(n_ctx), llama_cpp.__version__):
+        key.update(part.encode("utf-8") + b"\0")
+    for messages in prompts:
+        for message in messages:
+            key.update(f"{message['role']}\0{message['content']}\0".encode("utf-8"))
+    return cache_dir / f"{key.hexdigest()[:32]}.pkl"
+
+
+def attach_prompt_cache(
+    llm: Llama,
+    prompts: List[Messages],
+    capacity_bytes: int,
+    cache_path: Optional[Path] = None,
+) -> PromptPrefixCache:
+    """
+    Attaches a PromptPrefixCache holding the state after each prompt to a model.
+
+    The states are loaded from `cache_path` if it exists, otherwise every prompt is evaluated once, and the states
+    written to `cache_path` if one is given.
+    """
+    cache = PromptPrefixCache(capacity_bytes=capacity_bytes)
+    llm.set_cache(cache)
+    if cache_path is not None and cache_path.exists():
+        try:
+            cache.load(cache_path)
+            logger.info(f"Loaded {len(cache.cache_state)} prompt prefix state(s) from {cache_path}")
+        except Exception:
+            logger.exception(f"Ignoring unreadable prompt cache {cache_path}")
+            cache.cache_state.clear()
+    if not cache.cache_state:
+        for messages in prompts:
+            cache.record(llm, messages)
+        if cache_path is not None:
+            cache.save(cache_path)
+            logger.info(f"Saved {len(cache.cache_state)} prompt prefix state(s) to {cache_path}")
+    return cache
+
+
+def reset_timings(llm: Llama) -> None:
+    llama_cpp.llama_reset_timings(llm.ctx)
+
+
+def prompt_eval_timings(llm: Llama) -> Tuple[int, float]:
+    """The number of prompt tokens llama.cpp evaluated since the last `reset_timings`, and the seconds it took."""
+    timings = llama_cpp.llama_get_timings(llm.ctx)
+    return timings.n_p_eval, timings.t_p_eval_ms / 1000
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -8,3 +9,6 @@ N_GPU_LAYERS = 4
 # Models
 MISTRAL_7B_FILE = "mistral-7b-instruct-v0.2.Q4_K_M.gguf"
 MIXTRAL_7B_FILE = "Mixtral_8x7B_Instruct_v0.1.gguf"
+
+# Memory the model registry may fill with loaded models (weights plus context); unset means no limit
+MODEL_RAM_BUDGET_BYTES = int(float(os.environ["MODEL_RAM_BUDGET_GB"]) * 1024**3) if os.environ.get("MODEL_RAM_BUDGET_GB") else None
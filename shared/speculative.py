@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+import numpy.typing as npt
+from llama_cpp import Llama
+from llama_cpp.llama_speculative import LlamaDraftModel
+
+# Target tokens re-tokenized along with the draft, so the draft's first token is split the way the target would
+_TAIL_TOKENS = 8
+
+
+def same_vocabulary(first: Llama, second: Llama, samples: int = 64) -> bool:
+    """Whether two models share a tokenizer (token ids can be passed between them), judged from a sample of tokens."""
+    n_vocab = first.n_vocab()
+    if n_vocab != second.n_vocab():
+        return False
+    step = max(1, n_vocab // samples)
+    return all(first.detokenize([token]) == second.detokenize([token]) for token in range(0, n_vocab, step))
+
+
+class SmallModelDraft(LlamaDraftModel):
+    """Drafts the next tokens of a large model with a small one, for llama.cpp speculative decoding.
+
+    llama-cpp-python evaluates the drafted tokens with the large (target) model in a single batch and keeps them
+    only as far as they match what the target samples itself, so the output distribution is the target's: the
+    draft only decides how many tokens each target forward pass yields. The draft model generates greedily and
+    keeps its own KV cache, so each call only evaluates the tokens added since the previous one.
+
+    When the models have different tokenizers (TinyLlama and Mistral do), the context is passed to the draft model
+    as text and its draft is re-tokenized for the target. Drafts that re-tokenize differently are simply rejected.
+
+    Attributes:
+        calls (int): The number of drafts requested.
+        drafted (int): The number of tokens drafted.
+        accepted (int): The number of drafted tokens the target accepted.
+    """
+
+    def __init__(self, draft_llm: Llama, target_llm: Llama, num_draft_tokens: int = 8):
+        self.draft_llm = draft_llm
+        self.target_llm = target_llm
+        self.num_draft_tokens = num_draft_tokens
+        self.shared_vocabulary = same_vocabulary(draft_llm, target_llm)
+        self.calls = 0
+        self.drafted = 0
+        self.accepted = 0
+        self._last_input_length = 0
+        self._last_draft: List[int] = []
+
+    def __call__(self, input_ids: npt.NDArray[np.intc], /, **kwargs: Any) -> npt.NDArray[np.intc]:
+        self._count_accepted(input_ids)
+        if self.shared_vocabulary:
+            draft_input = input_ids.tolist()
+        else:
+            draft_input = self.draft_llm.tokenize(self.target_llm.detokenize(input_ids.tolist()), special=True)
+
+        drafted: List[int] = []
+        if len(draft_input) < self.draft_llm.n_ctx() - self.num_draft_tokens:
+            for token in self.draft_llm.generate(draft_input, temp=0.0):
+                if token == self.draft_llm.token_eos():
+                    break
+                drafted.append(token)
+                if len(drafted) == self.num_draft_tokens:
+                    break
+        if not self.shared_vocabulary and drafted:
+            drafted = self._to_target(input_ids.tolist(), drafted)
+
+        self.calls += 1
+        self.drafted += len(drafted)
+        self._last_input_length = len(input_ids)
+        self._last_draft = drafted
+        return np.array(drafted, dtype=np.intc)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "drafted": self.drafted,
+            "accepted": self.accepted,
+            "acceptance_rate": self.accepted / self.drafted if self.drafted else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        self.calls = self.drafted = self.accepted = 0
+        self._last_input_length = 0
+        self._last_draft = []
+
+    def _count_accepted(self, input_ids: npt.NDArray[np.intc]) -> None:
+        # the target keeps the accepted prefix of the last draft, then appends a token of its own
+        if not self._last_draft or len(input_ids) <= self._last_input_length:
+            return
+        kept = input_ids[self._last_input_length : self._last_input_length + len(self._last_draft)].tolist()
+        for drafted, target in zip(self._last_draft, kept):
+            if drafted != target:
+                break
+            self.accepted += 1
+
+    def _to_target(self, input_ids: List[int], drafted: List[int]) -> List[int]:
+        tail = self.target_llm.detokenize(input_ids[-_TAIL_TOKENS:])
+        base = self.target_llm.tokenize(tail, add_bos=False)
+        extended = self.target_llm.tokenize(tail + self.draft_llm.detokenize(drafted), add_bos=False)
+        if extended[: len(base)] != base:
+            return []
+        return extended[len(base) :]
+
+
+@contextmanager
+def speculative_decoding(target_llm: Llama, draft: LlamaDraftModel) -> Iterator[LlamaDraftModel]:
+    """Generates with `target_llm` using `draft` for speculative decoding inside the block."""
+    previous = target_llm.draft_model
+    target_llm.draft_model = draft
+    try:
+        yield draft
+    finally:
+        target_llm.draft_model = previous
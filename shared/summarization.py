@@ -0,0 +1,135 @@
+import re
+from typing import Callable, Dict, List
+
+from llama_cpp import Llama
+
+CHUNK_SYSTEM_PROMPT = (
+    "You are responsible for taking notes on one part of a podcast transcript, or on notes about it. "
+    "List the key points of this part in a few concise sentences. Keep any dates, names and notable "
+    "quotes from the interview subject verbatim, marking quotes with double quotes. "
+    "Only use information from the text, do not make assumptions."
+)
+
+# llama.cpp chat formats whose template has no system turn, and which silently drop system messages
+FORMATS_WITHOUT_SYSTEM_ROLE = ("mistral-instruct",)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def chat_messages(llm: Llama, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    """A system and a user message, or for chat formats without a system turn, one user message starting with the
+    system prompt. Either way every prompt with the same system prompt starts with the same tokens."""
+    if getattr(llm, "chat_format", None) in FORMATS_WITHOUT_SYSTEM_ROLE:
+        return [{"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}]
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences (and lines), dropping empty ones."""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def chunk_by_tokens(
+    text: str, count_tokens: Callable[[str], int], chunk_tokens: int, overlap_tokens: int = 0
+) -> List[str]:
+    """Pack whole sentences into chunks of at most `chunk_tokens` tokens.
+
+    Each chunk starts with up to `overlap_tokens` tokens of trailing sentences from the previous
+    chunk, so points spanning a boundary are not lost. Sentences longer than a chunk are split on
+    words.
+    """
+    pieces: List[tuple] = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens <= chunk_tokens:
+            pieces.append((sentence, tokens))
+            continue
+        words, current = sentence.split(), []
+        for word in words:
+            if current and count_tokens(" ".join(current + [word])) > chunk_tokens:
+                pieces.append((" ".join(current), count_tokens(" ".join(current))))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append((" ".join(current), count_tokens(" ".join(current))))
+
+    chunks: List[str] = []
+    current: List[tuple] = []
+    current_tokens = 0
+    for piece in pieces:
+        if current and current_tokens + piece[1] > chunk_tokens:
+            chunks.append(" ".join(sentence for sentence, _ in current))
+            overlap: List[tuple] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                if overlap_size + previous[1] > overlap_tokens or overlap_size + previous[1] + piece[1] > chunk_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous[1]
+            current, current_tokens = overlap, overlap_size
+        current.append(piece)
+        current_tokens += piece[1]
+    if current:
+        chunks.append(" ".join(sentence for sentence, _ in current))
+    return chunks
+
+
+def combine_notes(notes: List[str]) -> str:
+    """The reduce-step user prompt: the notes on each consecutive part of one transcript, in order."""
+    parts = "\n\n".join(f"Part {index} of {len(notes)}:\n{note}" for index, note in enumerate(notes, start=1))
+    return (
+        "The transcript is too long to show in full. Here are notes on each consecutive part of it, "
+        f"in order. Summarize the whole episode from them.\n\n{parts}"
+    )
+
+
+def summarize_chunk(llm: Llama, text: str, max_tokens: int, temperature: float = 0.2) -> str:
+    """The map step: free-text notes on one chunk of a transcript (or on a group of notes)."""
+    response = llm.create_chat_completion(
+        messages=chat_messages(llm, CHUNK_SYSTEM_PROMPT, text),
+        max_tokens=max_tokens,
+        temperature=temperature,
+    )
+    return response["choices"][0]["message"]["content"].strip()
+
+
+def token_counter(llm: Llama) -> Callable[[str], int]:
+    """Count tokens with the model's own tokenizer (a vocab_only Llama is enough)."""
+    return lambda text: len(llm.tokenize(text.encode("utf-8"), add_bos=False))
+
+
+def check_progress(previous_tokens: int, tokens: int) -> None:
+    """Raise ValueError unless a round of notes is shorter than its input, so reducing always terminates."""
+    if tokens >= previous_tokens:
+        raise ValueError(
+            f"A round of notes did not shrink the text ({previous_tokens} -> {tokens} tokens); "
+            "the notes on each chunk must be shorter than the chunk"
+        )
+
+
+def map_reduce_notes(
+    llm: Llama,
+    text: str,
+    input_budget: int,
+    chunk_tokens: int,
+    overlap_tokens: int,
+    max_tokens: int,
+) -> List[str]:
+    """Sequentially reduce a text to notes that together fit in `input_budget` tokens.
+
+    The text is chunked and each chunk summarized; while the combined notes are still too long,
+    they are grouped into chunks and summarized again. For a text that already fits, the text
+    itself is returned as the only note. Raises ValueError if a round does not shrink the notes.
+    """
+    count_tokens = token_counter(llm)
+    notes = [text]
+    tokens = count_tokens(combine_notes(notes))
+    while tokens > input_budget:
+        chunks = chunk_by_tokens("\n".join(notes), count_tokens, chunk_tokens, overlap_tokens)
+        notes = [summarize_chunk(llm, chunk, max_tokens=max_tokens) for chunk in chunks]
+        previous, tokens = tokens, count_tokens(combine_notes(notes))
+        check_progress(previous, tokens)
+    return notes